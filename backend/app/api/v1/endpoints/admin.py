@@ -1,19 +1,39 @@
 """
 Admin Endpoints - Platform administration
 """
-from typing import Any, List, Optional
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+import re
+from typing import Any, List, Optional, Tuple
+from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from beanie import PydanticObjectId
 from pydantic import BaseModel
 
-from app.models.user import User, UserRole, AvailabilityStatus
+from app.models.user import User, UserRole, AvailabilityStatus, normalize_search_text
 from app.models.session import Session, SessionStatus
 from app.models.review import Review
+from app.models.bulk_job import BulkJobStatus
 from app.api import deps
+from app.core.cache import SWRCache, invalidate_users
+from app.core.config import settings
+from app.db.mongodb import pool_status, secondary_aggregate
+from app.services.stats_service import stats_service
+from app.services.export_service import export_service, ExportDataset, ExportFormat
+from app.services.bulk_action_service import bulk_action_service, BulkActionJob
 
 router = APIRouter()
 
+# Maximum number of index matches ranked per admin search
+SEARCH_CANDIDATE_LIMIT = 1000
+
+# Shared by every admin viewing the dashboard; see SWRCache for semantics
+dashboard_cache = SWRCache(
+    ttl=settings.ADMIN_CACHE_TTL_SECONDS,
+    stale_ttl=settings.ADMIN_CACHE_STALE_SECONDS
+)
+
 
 # --- Pydantic Models for Admin ---
 
@@ -51,6 +71,17 @@ class UserActionRequest(BaseModel):
     value: Optional[float] = None  # For credit adjustments
 
 
+class BulkUserActionRequest(BaseModel):
+    action: str  # 'activate', 'deactivate', 'set_offline', 'adjust_credits'
+    value: Optional[float] = None  # For credit adjustments
+    
+    # Target either explicit ids or a filter
+    user_ids: Optional[List[str]] = None
+    role: Optional[UserRole] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
 # --- Helper Functions ---
 
 async def verify_admin(current_user: User = Depends(deps.get_current_user)) -> User:
@@ -70,57 +101,160 @@ async def verify_admin(current_user: User = Depends(deps.get_current_user)) -> U
     )
 
 
+async def _aggregate_one(model, pipeline: List[dict]) -> dict:
+    """Run an aggregation that yields a single summary document (on a secondary if available)"""
+    results = await secondary_aggregate(model, pipeline).to_list()
+    return results[0] if results else {}
+
+
+async def _search_users(
+    search: str,
+    role: Optional[str],
+    skip: int,
+    limit: int
+) -> Tuple[List[User], bool]:
+    """
+    Prefix search over the indexed `search_keys`, ranked by match quality:
+    exact email, then exact name, then email prefix, then any name prefix.
+
+    Only the first SEARCH_CANDIDATE_LIMIT prefix matches are ranked, so the
+    work stays bounded for very short prefixes. Exact matches (the top two
+    ranks) are looked up separately and always included. Returns the page
+    and whether the prefix matches were cut off.
+    """
+    terms = search.split()
+    prefixes = [re.compile("^" + re.escape(term)) for term in terms]
+    match = {"search_keys": {"$all": prefixes}}
+    exact = {"search_keys": search}  # The normalized email and full name are keys too
+    if role:
+        match["role"] = role
+        exact["role"] = role
+
+    pipeline = [
+        {"$match": exact},
+        {"$unionWith": {"coll": User.get_collection_name(), "pipeline": [
+            {"$match": match},
+            {"$limit": SEARCH_CANDIDATE_LIMIT},
+            {"$set": {"_prefix_match": True}},
+        ]}},
+        # Exact matches usually come up among the prefix matches too
+        {"$group": {"_id": "$_id", "doc": {"$first": "$$ROOT"}, "prefix_match": {"$max": "$_prefix_match"}}},
+        {"$replaceWith": {"$mergeObjects": ["$doc", {"_prefix_match": "$prefix_match"}]}},
+        {"$addFields": {"_score": {"$add": [
+            {"$cond": [{"$eq": [{"$toLower": "$email"}, search]}, 8, 0]},
+            {"$cond": [{"$in": [search, "$search_keys"]}, 4, 0]},
+            {"$cond": [{"$eq": [{"$indexOfCP": [{"$toLower": "$email"}, terms[0]]}, 0]}, 2, 0]},
+        ]}}},
+        {"$facet": {
+            "page": [
+                {"$sort": {"_score": -1, "created_at": -1, "_id": 1}},
+                {"$skip": skip},
+                {"$limit": limit},
+            ],
+            "prefix_matches": [{"$match": {"_prefix_match": True}}, {"$count": "count"}],
+        }},
+    ]
+    results = await User.aggregate(pipeline).to_list()
+    result = results[0] if results else {}
+    users = [User.model_validate(doc) for doc in result.get("page", [])]
+    return users, _facet_count(result, "prefix_matches") >= SEARCH_CANDIDATE_LIMIT
+
+
+def _resolve_timezone(tz: str) -> ZoneInfo:
+    """Parse an IANA time zone name from a query parameter"""
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown time zone: {tz}")
+
+
+def _link_id(field: str) -> dict:
+    """Aggregation expression for the referenced id of a Link field (`<field>.$id`)"""
+    return {"$getField": {"field": {"$literal": "$id"}, "input": f"${field}"}}
+
+
+def _facet_count(facet_result: dict, name: str) -> int:
+    """Extract the value of a `$count` stage from a `$facet` branch"""
+    rows = facet_result.get(name) or []
+    return rows[0]["count"] if rows else 0
+
+
 # --- Endpoints ---
 
-@router.get("/stats", response_model=PlatformStats)
-async def get_platform_stats(
-    admin: User = Depends(verify_admin)
-) -> Any:
-    """Get platform-wide statistics"""
+async def _compute_platform_stats() -> PlatformStats:
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    # One aggregation per collection, run concurrently. Every count and sum is
+    # computed by MongoDB, so memory use doesn't grow with collection size.
+    user_stats, session_stats, review_stats = await asyncio.gather(
+        _aggregate_one(User, [
+            {"$facet": {
+                "by_role": [{"$group": {"_id": "$role", "count": {"$sum": 1}}}],
+                "today": [{"$match": {"created_at": {"$gte": today_start}}}, {"$count": "count"}],
+            }}
+        ]),
+        _aggregate_one(Session, [
+            {"$facet": {
+                "by_status": [{"$group": {
+                    "_id": "$status",
+                    "count": {"$sum": 1},
+                    "revenue": {"$sum": {"$ifNull": ["$total_cost", 0]}},
+                }}],
+                "today": [{"$match": {"created_at": {"$gte": today_start}}}, {"$count": "count"}],
+            }}
+        ]),
+        _aggregate_one(Review, [
+            {"$group": {"_id": None, "count": {"$sum": 1}, "avg_rating": {"$avg": "$rating"}}}
+        ]),
+    )
     
     # User stats
-    total_users = await User.count()
-    total_clients = await User.find(User.role == UserRole.CLIENT).count()
-    total_consultants = await User.find(User.role == UserRole.CONSULTANT).count()
+    users_by_role = {row["_id"]: row["count"] for row in user_stats.get("by_role", [])}
     
     # Session stats
-    total_sessions = await Session.count()
-    completed_sessions = await Session.find(Session.status == SessionStatus.COMPLETED).count()
-    active_sessions = await Session.find(Session.status == SessionStatus.ACTIVE).count()
-    pending_sessions = await Session.find(Session.status == SessionStatus.PENDING).count()
-    
-    # Revenue (sum of all completed session costs)
-    completed = await Session.find(Session.status == SessionStatus.COMPLETED).to_list()
-    total_revenue = sum(s.total_cost for s in completed if s.total_cost)
+    sessions_by_status = {row["_id"]: row for row in session_stats.get("by_status", [])}
+    completed = sessions_by_status.get(SessionStatus.COMPLETED.value, {})
     
     # Review stats
-    reviews = await Review.find_all().to_list()
-    total_reviews = len(reviews)
-    avg_rating = sum(r.rating for r in reviews) / total_reviews if total_reviews > 0 else 5.0
-    
-    # Today's stats
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    users_today = await User.find(User.created_at >= today_start).count()
-    sessions_today = await Session.find(Session.created_at >= today_start).count()
+    total_reviews = review_stats.get("count", 0)
+    avg_rating = review_stats.get("avg_rating") if total_reviews > 0 else 5.0
     
     return PlatformStats(
-        total_users=total_users,
-        total_clients=total_clients,
-        total_consultants=total_consultants,
-        total_sessions=total_sessions,
-        completed_sessions=completed_sessions,
-        active_sessions=active_sessions,
-        pending_sessions=pending_sessions,
-        total_revenue=total_revenue,
+        total_users=sum(users_by_role.values()),
+        total_clients=users_by_role.get(UserRole.CLIENT.value, 0),
+        total_consultants=users_by_role.get(UserRole.CONSULTANT.value, 0),
+        total_sessions=sum(row["count"] for row in sessions_by_status.values()),
+        completed_sessions=completed.get("count", 0),
+        active_sessions=sessions_by_status.get(SessionStatus.ACTIVE.value, {}).get("count", 0),
+        pending_sessions=sessions_by_status.get(SessionStatus.PENDING.value, {}).get("count", 0),
+        total_revenue=completed.get("revenue", 0.0),
         total_reviews=total_reviews,
         avg_rating=round(avg_rating, 2),
-        users_today=users_today,
-        sessions_today=sessions_today
+        users_today=_facet_count(user_stats, "today"),
+        sessions_today=_facet_count(session_stats, "today")
     )
 
 
+@router.get("/stats", response_model=PlatformStats)
+async def get_platform_stats(
+    admin: User = Depends(verify_admin),
+    fresh: bool = Query(default=False, description="Bypass the dashboard cache")
+) -> Any:
+    """Get platform-wide statistics"""
+    return await dashboard_cache.get(("stats",), _compute_platform_stats, fresh=fresh)
+
+
+@router.get("/db/pool")
+async def get_db_pool(
+    admin: User = Depends(verify_admin)
+) -> Any:
+    """MongoDB connection pool settings and per-server utilization"""
+    return pool_status()
+
+
 @router.get("/users", response_model=List[AdminUserResponse])
 async def list_all_users(
+    response: Response,
     admin: User = Depends(verify_admin),
     role: Optional[str] = None,
     search: Optional[str] = None,
@@ -129,21 +263,17 @@ async def list_all_users(
 ) -> Any:
     """List all users with optional filtering"""
     
-    query = User.find()
-    
-    if role:
-        query = query.find(User.role == role)
-    
+    search = normalize_search_text(search) if search else None
     if search:
-        query = query.find({
-            "$or": [
-                {"email": {"$regex": search, "$options": "i"}},
-                {"first_name": {"$regex": search, "$options": "i"}},
-                {"last_name": {"$regex": search, "$options": "i"}}
-            ]
-        })
-    
-    users = await query.sort("-created_at").skip(skip).limit(limit).to_list()
+        users, truncated = await _search_users(search, role, skip, limit)
+        if truncated:
+            # Too many prefix matches to rank them all; a longer search narrows them
+            response.headers["X-Search-Truncated"] = "true"
+    else:
+        query = User.find()
+        if role:
+            query = query.find(User.role == role)
+        users = await query.sort("-created_at").skip(skip).limit(limit).to_list()
     
     return [
         AdminUserResponse(
@@ -166,7 +296,9 @@ async def list_all_users(
 @router.get("/users/{user_id}")
 async def get_user_details(
     user_id: str,
-    admin: User = Depends(verify_admin)
+    admin: User = Depends(verify_admin),
+    skip: int = 0,
+    limit: int = Query(default=10, le=100)
 ) -> Any:
     """Get detailed info about a specific user"""
     
@@ -174,17 +306,50 @@ async def get_user_details(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get user's sessions
-    sessions = await Session.find({
-        "$or": [
-            {"client.$id": user.id},
-            {"consultant.$id": user.id}
-        ]
-    }).sort("-created_at").limit(20).to_list()
+    involves_user = {"$or": [{"client.$id": user.id}, {"consultant.$id": user.id}]}
+    completed = {"$eq": ["$status", SessionStatus.COMPLETED.value]}
+    
+    # One aggregation per collection, run concurrently
+    session_stats, review_stats = await asyncio.gather(
+        _aggregate_one(Session, [
+            {"$match": involves_user},
+            {"$facet": {
+                "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                "totals": [{"$group": {
+                    "_id": None,
+                    "spend": {"$sum": {"$cond": [
+                        {"$eq": [_link_id("client"), user.id]}, {"$ifNull": ["$total_cost", 0]}, 0
+                    ]}},
+                    "earnings": {"$sum": {"$cond": [
+                        {"$eq": [_link_id("consultant"), user.id]}, {"$ifNull": ["$total_cost", 0]}, 0
+                    ]}},
+                    # $avg skips the nulls produced for unfinished sessions
+                    "avg_duration_ms": {"$avg": {"$cond": [
+                        {"$and": [completed, "$actual_start_time", "$actual_end_time"]},
+                        {"$subtract": ["$actual_end_time", "$actual_start_time"]},
+                        None
+                    ]}},
+                }}],
+                "recent": [
+                    {"$sort": {"created_at": -1}},
+                    {"$skip": skip},
+                    {"$limit": limit},
+                    {"$project": {"topic": 1, "status": 1, "created_at": 1, "total_cost": 1}},
+                ],
+            }}
+        ]),
+        _aggregate_one(Review, [
+            {"$match": involves_user},
+            {"$facet": {
+                "given": [{"$match": {"client.$id": user.id}}, {"$count": "count"}],
+                "received": [{"$match": {"consultant.$id": user.id}}, {"$count": "count"}],
+            }}
+        ]),
+    )
     
-    # Get user's reviews (given or received)
-    reviews_given = await Review.find({"client.$id": user.id}).count()
-    reviews_received = await Review.find({"consultant.$id": user.id}).count() if user.role == UserRole.CONSULTANT else 0
+    sessions_by_status = {row["_id"]: row["count"] for row in session_stats.get("by_status", [])}
+    totals = (session_stats.get("totals") or [{}])[0]
+    avg_duration_ms = totals.get("avg_duration_ms")
     
     return {
         "user": AdminUserResponse(
@@ -200,18 +365,22 @@ async def get_user_details(
             created_at=user.created_at,
             is_active=getattr(user, 'is_active', True)
         ),
-        "session_count": len(sessions),
-        "reviews_given": reviews_given,
-        "reviews_received": reviews_received,
+        "session_count": sum(sessions_by_status.values()),
+        "sessions_by_status": sessions_by_status,
+        "lifetime_spend": totals.get("spend", 0.0),
+        "lifetime_earnings": totals.get("earnings", 0.0),
+        "avg_duration_minutes": round(avg_duration_ms / 60000, 1) if avg_duration_ms else 0,
+        "reviews_given": _facet_count(review_stats, "given"),
+        "reviews_received": _facet_count(review_stats, "received"),
         "recent_sessions": [
             {
-                "id": str(s.id),
-                "topic": s.topic,
-                "status": s.status.value,
-                "created_at": s.created_at,
-                "total_cost": s.total_cost
+                "id": str(s["_id"]),
+                "topic": s.get("topic"),
+                "status": s.get("status"),
+                "created_at": s.get("created_at"),
+                "total_cost": s.get("total_cost", 0.0)
             }
-            for s in sessions[:10]
+            for s in session_stats.get("recent", [])
         ]
     }
 
@@ -233,29 +402,78 @@ async def perform_user_action(
     if action == "adjust_credits":
         if action_request.value is None:
             raise HTTPException(status_code=400, detail="Value required for credit adjustment")
-        user.credits += action_request.value
-        await user.save()
+        await user.inc({User.credits: action_request.value})
+        await invalidate_users([user.id])
         return {"message": f"Credits adjusted by {action_request.value}. New balance: {user.credits}"}
     
     elif action == "set_offline":
-        user.status = AvailabilityStatus.OFFLINE
-        await user.save()
+        await user.set({User.status: AvailabilityStatus.OFFLINE})
+        await invalidate_users([user.id])
         return {"message": "User set to offline"}
     
     elif action == "activate":
-        user.is_active = True
-        await user.save()
+        await user.set({User.is_active: True})
+        await invalidate_users([user.id])
         return {"message": "User activated"}
     
     elif action == "deactivate":
-        user.is_active = False
-        await user.save()
+        await user.set({User.is_active: False})
+        await invalidate_users([user.id])
         return {"message": "User deactivated"}
     
     else:
         raise HTTPException(status_code=400, detail=f"Unknown action: {action}")
 
 
+@router.post("/users/bulk-action", response_model=BulkActionJob)
+async def perform_bulk_user_action(
+    action_request: BulkUserActionRequest,
+    response: Response,
+    admin: User = Depends(verify_admin)
+) -> Any:
+    """
+    Apply an admin action to many users, by id list or by filter.
+    Small targets finish inline; larger ones return 202 with a job to poll.
+    """
+    match = {}
+    if action_request.user_ids is not None:
+        try:
+            match["_id"] = {"$in": [PydanticObjectId(i) for i in action_request.user_ids]}
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid user id in user_ids")
+    if action_request.role:
+        match["role"] = action_request.role.value
+    if action_request.created_after or action_request.created_before:
+        match["created_at"] = {
+            **({"$gte": action_request.created_after} if action_request.created_after else {}),
+            **({"$lt": action_request.created_before} if action_request.created_before else {}),
+        }
+    
+    if not match:
+        raise HTTPException(status_code=400, detail="Provide user_ids or at least one filter")
+    
+    try:
+        job = await bulk_action_service.start(action_request.action, match, action_request.value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if job.status == BulkJobStatus.RUNNING:
+        response.status_code = 202
+    return job
+
+
+@router.get("/users/bulk-action/{job_id}", response_model=BulkActionJob)
+async def get_bulk_user_action(
+    job_id: str,
+    admin: User = Depends(verify_admin)
+) -> Any:
+    """Get progress of a bulk user action"""
+    job = await bulk_action_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
 @router.get("/sessions")
 async def list_all_sessions(
     admin: User = Depends(verify_admin),
@@ -292,33 +510,53 @@ async def list_all_sessions(
     return result
 
 
+async def _compute_revenue_analytics(days: int, tz: str) -> dict:
+    daily = await stats_service.get_daily_series(
+        days, _resolve_timezone(tz), ["revenue", "sessions_completed"]
+    )
+    
+    return {
+        "period_days": days,
+        "timezone": tz,
+        "total_revenue": sum(d["revenue"] for d in daily.values()),
+        "session_count": int(sum(d["sessions_completed"] for d in daily.values())),
+        "daily_breakdown": [
+            {"date": date, "revenue": d["revenue"]}
+            for date, d in sorted(daily.items())
+            if d["sessions_completed"]
+        ]
+    }
+
+
 @router.get("/analytics/revenue")
 async def get_revenue_analytics(
     admin: User = Depends(verify_admin),
-    days: int = Query(default=30, le=365)
+    days: int = Query(default=30, le=365),
+    tz: str = Query(default="UTC", description="IANA time zone for day boundaries"),
+    fresh: bool = Query(default=False, description="Bypass the dashboard cache")
 ) -> Any:
     """Get revenue analytics for the past N days"""
-    
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    sessions = await Session.find(
-        Session.status == SessionStatus.COMPLETED,
-        Session.created_at >= start_date
-    ).sort("created_at").to_list()
-    
-    # Group by day
-    daily_revenue = {}
-    for s in sessions:
-        day = s.created_at.strftime("%Y-%m-%d")
-        daily_revenue[day] = daily_revenue.get(day, 0) + (s.total_cost or 0)
+    _resolve_timezone(tz)  # Reject unknown zones before touching the cache
+    return await dashboard_cache.get(
+        ("revenue", days, tz), lambda: _compute_revenue_analytics(days, tz), fresh=fresh
+    )
+
+
+async def _compute_user_analytics(days: int, tz: str) -> dict:
+    daily = await stats_service.get_daily_series(
+        days, _resolve_timezone(tz), ["signups", "new_clients", "new_consultants"]
+    )
     
     return {
         "period_days": days,
-        "total_revenue": sum(daily_revenue.values()),
-        "session_count": len(sessions),
+        "timezone": tz,
+        "total_new_users": int(sum(d["signups"] for d in daily.values())),
+        "new_clients": int(sum(d["new_clients"] for d in daily.values())),
+        "new_consultants": int(sum(d["new_consultants"] for d in daily.values())),
         "daily_breakdown": [
-            {"date": date, "revenue": revenue}
-            for date, revenue in sorted(daily_revenue.items())
+            {"date": date, "signups": int(d["signups"])}
+            for date, d in sorted(daily.items())
+            if d["signups"]
         ]
     }
 
@@ -326,31 +564,41 @@ async def get_revenue_analytics(
 @router.get("/analytics/users")
 async def get_user_analytics(
     admin: User = Depends(verify_admin),
-    days: int = Query(default=30, le=365)
+    days: int = Query(default=30, le=365),
+    tz: str = Query(default="UTC", description="IANA time zone for day boundaries"),
+    fresh: bool = Query(default=False, description="Bypass the dashboard cache")
 ) -> Any:
     """Get user registration analytics"""
-    
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    users = await User.find(User.created_at >= start_date).sort("created_at").to_list()
-    
-    # Group by day
-    daily_signups = {}
-    for u in users:
-        day = u.created_at.strftime("%Y-%m-%d")
-        daily_signups[day] = daily_signups.get(day, 0) + 1
-    
-    # Count by role
-    clients = sum(1 for u in users if u.role == UserRole.CLIENT)
-    consultants = sum(1 for u in users if u.role == UserRole.CONSULTANT)
-    
-    return {
-        "period_days": days,
-        "total_new_users": len(users),
-        "new_clients": clients,
-        "new_consultants": consultants,
-        "daily_breakdown": [
-            {"date": date, "signups": count}
-            for date, count in sorted(daily_signups.items())
-        ]
-    }
+    _resolve_timezone(tz)  # Reject unknown zones before touching the cache
+    return await dashboard_cache.get(
+        ("users", days, tz), lambda: _compute_user_analytics(days, tz), fresh=fresh
+    )
+
+
+@router.get("/export/{dataset}")
+async def export_dataset(
+    dataset: ExportDataset,
+    request: Request,
+    admin: User = Depends(verify_admin),
+    format: ExportFormat = ExportFormat.CSV,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    role: Optional[UserRole] = None,
+    status: Optional[SessionStatus] = None
+) -> Any:
+    """
+    Stream a full collection as CSV or NDJSON.
+    Rows come straight from a database cursor, so memory stays flat for any size.
+    """
+    match = {}
+    if role and dataset == ExportDataset.USERS:
+        match["role"] = role.value
+    if status and dataset == ExportDataset.SESSIONS:
+        match["status"] = status.value
+    
+    filename = f"{dataset.value}-{datetime.utcnow():%Y%m%d-%H%M%S}.{format.value}"
+    return StreamingResponse(
+        export_service.stream(request, dataset, format, match=match, since=since, until=until),
+        media_type=export_service.media_type(format),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
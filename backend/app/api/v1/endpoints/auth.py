@@ -12,6 +12,8 @@ from app.schemas.user import UserCreate, UserResponse, UserLogin
 from app.core import security
 from app.api import deps
 from app.core.config import settings
+from app.core.cache import invalidate_users
+from app.services.stats_service import stats_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -67,6 +69,8 @@ async def register(user_in: UserCreate) -> Any:
     
     user = User(**user_data)
     await user.create()
+    await stats_service.record_user_registered(user)
+    await invalidate_users([user.id])
     
     # Convert Beanie document to dict and ensure id is a string
     user_dict = user.model_dump()
@@ -230,6 +234,9 @@ async def complete_google_signup(
             raise HTTPException(status_code=400, detail="Account already exists")
         raise
     
+    await stats_service.record_user_registered(user)
+    await invalidate_users([user.id])
+    
     # Generate access token
     access_token = security.create_access_token(user.id)
     
@@ -2,13 +2,16 @@
 Config Endpoints - Expose client-side configuration
 """
 from typing import Any, Dict
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from app.api import deps
 from app.models.user import User
 from app.services.webrtc_service import webrtc_service
 
 router = APIRouter()
 
+# Responses carry per-user TURN credentials
+NO_STORE = {"Cache-Control": "private, no-store"}
+
 
 @router.get("/webrtc", response_model=Dict[str, Any])
 async def get_webrtc_config(
@@ -18,14 +21,22 @@ async def get_webrtc_config(
     Get WebRTC configuration including ICE servers.
     Requires authentication to prevent abuse of TURN credentials.
     """
-    return webrtc_service.get_rtc_configuration()
+    return Response(
+        content=webrtc_service.get_rtc_configuration(str(current_user.id)),
+        media_type="application/json",
+        headers=NO_STORE
+    )
 
 
-@router.get("/ice-servers")
+@router.get("/ice-servers", response_model=Dict[str, Any])
 async def get_ice_servers(
     current_user: User = Depends(deps.get_current_user)
 ) -> Any:
     """
     Get ICE servers list for WebRTC.
     """
-    return {"iceServers": webrtc_service.get_ice_servers()}
+    return Response(
+        content=webrtc_service.get_ice_servers(str(current_user.id)),
+        media_type="application/json",
+        headers=NO_STORE
+    )
@@ -1,14 +1,22 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from beanie import PydanticObjectId
+from pymongo.errors import DuplicateKeyError
 from app.models.review import Review
 from app.models.session import Session, SessionStatus
 from app.models.user import User
 from app.schemas.review import ReviewCreate, ReviewResponse
 from app.api import deps
+from app.core.cache import invalidate_users, response_cache, user_tag
+from app.core.config import settings
+from app.services.stats_service import stats_service
 
 router = APIRouter()
 
+# Largest page of reviews returned at once
+MAX_REVIEW_PAGE_SIZE = 100
+
 @router.post("/", response_model=ReviewResponse)
 async def create_review(
     review_in: ReviewCreate,
@@ -29,59 +37,123 @@ async def create_review(
     if session.status != SessionStatus.COMPLETED:
         raise HTTPException(status_code=400, detail="Can only review completed sessions")
 
-    # 3. Check if already reviewed
-    existing = await Review.find_one(Review.session.id == session.id)
-    if existing:
-        raise HTTPException(status_code=400, detail="You have already reviewed this session")
-        
-    # 4. Create Review
+    # 3. Create Review; the unique index on its session rejects a second one
     consultant_id = session.consultant.ref.id if hasattr(session.consultant, 'ref') else session.consultant.id
-    consultant = await User.get(consultant_id)
     
     review = Review(
         session=session,
         client=current_user,
-        consultant=consultant,
+        consultant=session.consultant,
         rating=review_in.rating,
-        comment=review_in.comment
+        comment=review_in.comment,
+        client_name=f"{current_user.first_name} {current_user.last_name}",
+        client_avatar_url=current_user.avatar_url
     )
-    await review.create()
-    
-    # 5. Update Consultant Rating
-    # Fetch all reviews for consultant to aggregate
-    reviews = await Review.find(Review.consultant.id == consultant.id).to_list()
-    total_rating = sum(r.rating for r in reviews)
-    count = len(reviews)
+    try:
+        await review.create()
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="You have already reviewed this session")
+    await stats_service.record_review_created(review)
     
-    consultant.rating = total_rating / count if count > 0 else 5.0
-    consultant.review_count = count
-    await consultant.save()
+    # 4. Update Consultant Rating
+    # Fold the new stars into a running total, the star histogram and the
+    # Bayesian score with one atomic update, so the cost doesn't grow with
+    # the review count. Profiles rated before the total existed start from
+    # rating * review_count.
+    rating_total = {"$ifNull": ["$rating_total", {"$multiply": [
+        {"$ifNull": ["$rating", 0]}, {"$ifNull": ["$review_count", 0]}
+    ]}]}
+    star = str(review.rating)
+    prior_weight = settings.RATING_PRIOR_WEIGHT
+    await User.find_one(User.id == consultant_id).update([
+        {"$set": {
+            "rating_total": {"$add": [rating_total, review.rating]},
+            "review_count": {"$add": [{"$ifNull": ["$review_count", 0]}, 1]},
+            "rating_histogram": {"$mergeObjects": [
+                "$rating_histogram",
+                {star: {"$add": [{"$ifNull": [f"$rating_histogram.{star}", 0]}, 1]}},
+            ]},
+        }},
+        {"$set": {
+            "rating": {"$divide": ["$rating_total", "$review_count"]},
+            "bayesian_rating": {"$divide": [
+                {"$add": [settings.RATING_PRIOR_MEAN * prior_weight, "$rating_total"]},
+                {"$add": [prior_weight, "$review_count"]},
+            ]},
+        }},
+    ])
+    await invalidate_users([consultant_id])
     
     return ReviewResponse(
         id=str(review.id),
         rating=review.rating,
         comment=review.comment,
-        client_name=f"{current_user.first_name} {current_user.last_name}",
+        client_name=review.client_name,
+        client_avatar_url=review.client_avatar_url,
         created_at=review.created_at
     )
 
 @router.get("/consultant/{consultant_id}", response_model=List[ReviewResponse])
-async def get_consultant_reviews(consultant_id: str) -> Any:
-    reviews = await Review.find(Review.consultant.id == PydanticObjectId(consultant_id)).sort("-created_at").to_list()
+async def get_consultant_reviews(
+    consultant_id: str,
+    request: Request,
+    limit: int = Query(20, ge=1, le=MAX_REVIEW_PAGE_SIZE),
+    before: Optional[datetime] = Query(None, description="created_at of the last review already shown"),
+    before_id: Optional[str] = Query(None, description="id of the last review already shown"),
+) -> Any:
+    """Newest reviews first; pass the last review's created_at and id to get the next page"""
+    if not PydanticObjectId.is_valid(consultant_id):
+        raise HTTPException(status_code=400, detail="Invalid consultant id")
+    if before_id is not None and not PydanticObjectId.is_valid(before_id):
+        raise HTTPException(status_code=400, detail="Invalid before_id")
     
-    response = []
-    for r in reviews:
-        # Fetch client to get name
-        client = await User.get(r.client.ref.id)
-        client_name = f"{client.first_name} {client.last_name}" if client else "Anonymous"
+    async def compute() -> Any:
+        match = {"consultant.$id": PydanticObjectId(consultant_id)}
+        if before is not None:
+            older = {"created_at": {"$lt": before}}
+            if before_id:
+                match["$or"] = [older, {"created_at": before, "_id": {"$lt": PydanticObjectId(before_id)}}]
+            else:
+                match.update(older)
+        
+        reviews = await Review.aggregate([
+            {"$match": match},
+            {"$sort": {"created_at": -1, "_id": -1}},
+            {"$limit": limit},
+            {"$project": {
+                "rating": 1, "comment": 1, "created_at": 1,
+                "client": 1, "client_name": 1, "client_avatar_url": 1,
+            }},
+        ]).to_list()
         
-        response.append(ReviewResponse(
-            id=str(r.id),
-            rating=r.rating,
-            comment=r.comment,
-            client_name=client_name,
-            created_at=r.created_at
-        ))
+        # Reviews written before names were stored: one lookup for all of them
+        missing = [r["client"].id for r in reviews if not r.get("client_name")]
+        clients = {}
+        if missing:
+            users = await User.aggregate([
+                {"$match": {"_id": {"$in": missing}}},
+                {"$project": {"first_name": 1, "last_name": 1, "avatar_url": 1}},
+            ]).to_list()
+            clients = {u["_id"]: u for u in users}
         
-    return response
+        response = []
+        for r in reviews:
+            client_name, avatar_url = r.get("client_name"), r.get("client_avatar_url")
+            if not client_name:
+                client = clients.get(r["client"].id)
+                client_name = f"{client['first_name']} {client['last_name']}" if client else "Anonymous"
+                avatar_url = client.get("avatar_url") if client else None
+            
+            response.append(ReviewResponse(
+                id=str(r["_id"]),
+                rating=r["rating"],
+                comment=r["comment"],
+                client_name=client_name,
+                client_avatar_url=avatar_url,
+                created_at=r["created_at"]
+            ))
+            
+        return response
 
+    # New reviews invalidate the consultant, see create_review
+    return await response_cache.respond(request, compute, List[ReviewResponse], tags=[user_tag(consultant_id)])
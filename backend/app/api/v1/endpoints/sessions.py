@@ -1,6 +1,6 @@
 from typing import Any, List
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from beanie import PydanticObjectId, Link
 from beanie.operators import Or
 from app.models.session import Session, SessionStatus
@@ -9,7 +9,9 @@ from app.models.message import Message
 from app.schemas.session import SessionCreate, SessionResponse, SessionUpdate
 from app.schemas.message import MessageSchema
 from app.api import deps
-from app.services.email_service import email_service
+from app.core.cache import invalidate_users
+from app.services.email_queue_service import email_queue_service
+from app.services.stats_service import stats_service
 
 router = APIRouter()
 
@@ -63,7 +65,6 @@ async def manual_fetch_session_users(session: Session) -> Session:
 @router.post("/", response_model=SessionResponse)
 async def request_session(
     session_in: SessionCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     consultant = await User.get(PydanticObjectId(session_in.consultant_id))
@@ -94,14 +95,19 @@ async def request_session(
     
     await session.create()
     
-    # Send email notification to consultant (background task)
-    background_tasks.add_task(
-        email_service.send_session_request_notification,
+    # Queue email notification to consultant
+    await email_queue_service.enqueue(
+        "session_request",
+        f"session_request:{session.id}",
+        recipient=consultant,
         consultant_email=consultant.email,
         consultant_name=consultant.first_name,
         client_name=f"{current_user.first_name} {current_user.last_name}",
         topic=session_in.topic,
-        session_id=str(session.id)
+        session_id=str(session.id),
+        scheduled_at=session.scheduled_at,
+        rate_per_minute=session.cost_per_minute,
+        message=session.description
     )
     
     # Populate for response
@@ -112,7 +118,6 @@ async def request_session(
 @router.post("/{session_id}/accept", response_model=SessionResponse)
 async def accept_session(
     session_id: str,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     session = await Session.get(PydanticObjectId(session_id))
@@ -130,14 +135,18 @@ async def accept_session(
     session.status = SessionStatus.ACCEPTED
     await session.save()
     
-    # Send email notification to client
-    background_tasks.add_task(
-        email_service.send_session_accepted_notification,
+    # Queue email notification to client
+    await email_queue_service.enqueue(
+        "session_accepted",
+        f"session_accepted:{session.id}",
+        recipient=session.client,
         client_email=session.client.email,
         client_name=session.client.first_name,
         consultant_name=f"{current_user.first_name} {current_user.last_name}",
         topic=session.topic,
-        session_id=str(session.id)
+        session_id=str(session.id),
+        scheduled_at=session.scheduled_at,
+        rate_per_minute=session.cost_per_minute
     )
     
     return session_to_response(session)
@@ -145,7 +154,6 @@ async def accept_session(
 @router.post("/{session_id}/reject", response_model=SessionResponse)
 async def reject_session(
     session_id: str,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     session = await Session.get(PydanticObjectId(session_id))
@@ -160,9 +168,11 @@ async def reject_session(
     session.status = SessionStatus.REJECTED
     await session.save()
     
-    # Send email notification to client
-    background_tasks.add_task(
-        email_service.send_session_rejected_notification,
+    # Queue email notification to client
+    await email_queue_service.enqueue(
+        "session_rejected",
+        f"session_rejected:{session.id}",
+        recipient=session.client,
         client_email=session.client.email,
         client_name=session.client.first_name,
         consultant_name=f"{current_user.first_name} {current_user.last_name}",
@@ -204,8 +214,8 @@ async def start_session_video(
     
     # Mark consultant as BUSY
     if isinstance(session.consultant, User):
-        session.consultant.status = AvailabilityStatus.BUSY
-        await session.consultant.save()
+        await session.consultant.set({User.status: AvailabilityStatus.BUSY})
+        await invalidate_users([session.consultant.id])
 
     await session.save()
     return session_to_response(session)
@@ -297,6 +307,7 @@ async def update_session_status(
     
     await manual_fetch_session_users(session)
 
+    previous_status = session.status
     new_status = status_update.status
     if new_status:
         if new_status in [SessionStatus.ACCEPTED, SessionStatus.REJECTED]:
@@ -312,8 +323,7 @@ async def update_session_status(
         # When session ends (Completed or Cancelled), make consultant ONLINE again
         if new_status in [SessionStatus.COMPLETED, SessionStatus.CANCELLED]:
             if isinstance(session.consultant, User):
-                session.consultant.status = AvailabilityStatus.ONLINE
-                await session.consultant.save()
+                await session.consultant.set({User.status: AvailabilityStatus.ONLINE})
         
         if new_status == SessionStatus.COMPLETED:
             session.actual_end_time = datetime.utcnow()
@@ -325,16 +335,19 @@ async def update_session_status(
                 cost = rate * duration_minutes
                 
                 # Deduct
-                client = session.client
-                client.credits -= cost
-                await client.save()
-                
-                consultant = session.consultant
-                consultant.credits += cost
-                await consultant.save()
+                await session.client.inc({User.credits: -cost})
+                await session.consultant.inc({User.credits: cost})
                 
                 session.total_cost = cost
                 session.is_paid = True
             
     await session.save()
+    
+    if new_status in [SessionStatus.COMPLETED, SessionStatus.CANCELLED] and isinstance(session.consultant, User):
+        # Completion also moved the client's credits
+        await invalidate_users([session.client.id, session.consultant.id])
+    
+    if new_status == SessionStatus.COMPLETED and previous_status != SessionStatus.COMPLETED:
+        await stats_service.record_session_completed(session)
+    
     return session_to_response(session)
@@ -1,42 +1,165 @@
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Tuple, Union
 import re
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
-from app.models.user import User, UserRole
-from app.schemas.user import UserResponse, UserUpdate
+from beanie import PydanticObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request
+from app.models.user import User, UserRole, AvailabilityStatus, ConsultantSort, CONSULTANT_SORT_FIELDS, normalize_search_text
+from app.schemas.user import (
+    UserResponse, UserUpdate, ConsultantSearchResponse, SkillSuggestion, PublicUserResponse, UserBatchRequest
+)
 from app.api import deps
+from app.db.mongodb import secondary_aggregate
+from app.core.cache import CATALOG_TAG, invalidate_users, response_cache, user_tag
+from app.services.similarity_service import similarity_service
+from app.services.catalog_service import (
+    catalog_service, ConsultantFilters, facet_pipelines, format_facets
+)
 
 router = APIRouter()
 
+# How much each rating star adds to a consultant's text relevance score
+SEARCH_RATING_WEIGHT = 0.5
+
+# Most distinct ids resolved by one batch lookup
+MAX_BATCH_IDS = 500
+
+# Fields returned by batch lookups
+PUBLIC_PROFILE_PROJECTION = {name: 1 for name in PublicUserResponse.model_fields if name != "id"}
+
 def user_to_response(user: User) -> dict:
     """Convert Beanie User document to response dict with proper id serialization."""
     user_dict = user.model_dump()
     user_dict["id"] = str(user.id)
     return user_dict
 
+async def lookup_users(ids: List[str]) -> List[dict]:
+    """
+    Public profiles for `ids` with a single `$in` query, deduplicated and in
+    request order. Unknown and malformed ids are left out.
+    """
+    wanted = list(dict.fromkeys(i.strip() for i in ids if i and i.strip()))
+    if len(wanted) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+
+    object_ids = [PydanticObjectId(i) for i in wanted if PydanticObjectId.is_valid(i)]
+    if not object_ids:
+        return []
+    docs = await User.aggregate([
+        {"$match": {"_id": {"$in": object_ids}}},
+        {"$project": PUBLIC_PROFILE_PROJECTION},
+    ]).to_list()
+
+    found = {str(doc["_id"]): doc for doc in docs}
+    return [{**found[i], "id": i} for i in wanted if i in found]
+
+async def query_consultants(
+    filters: ConsultantFilters,
+    search: Optional[str],
+    prefix: bool,
+    skip: int,
+    limit: int,
+    sort: Optional[ConsultantSort] = None,
+    online_first: bool = False,
+    with_facets: bool = False
+) -> Tuple[List[User], Optional[dict]]:
+    """
+    Discovery straight from MongoDB, in one aggregation. A search term is
+    relevance-ranked: complete words go through the weighted, stemmed text
+    index and, with `prefix`, a trailing partial word is matched against the
+    indexed keywords; scores are blended with the Bayesian rating. An
+    explicit `sort` takes precedence over relevance, and `online_first`
+    moves consultants who are online ahead of the rest. With `with_facets`
+    the page and the facet counts come back from the same `$facet` round
+    trip.
+    """
+    terms = normalize_search_text(search).split() if search else []
+    prefix_term = terms.pop() if prefix and terms else None
+
+    # $text has to sit in the first stage, ahead of any $facet
+    search_match = {"role": UserRole.CONSULTANT.value}
+    if terms:
+        search_match["$text"] = {"$search": " ".join(terms)}
+    if prefix_term:
+        search_match["keywords"] = {"$regex": "^" + re.escape(prefix_term)}
+
+    order = []
+    if sort:
+        field, direction = CONSULTANT_SORT_FIELDS[sort]
+        sort_spec = {field: direction, "_id": 1}
+    elif terms or prefix_term:
+        text_score = {"$meta": "textScore"} if terms else 0
+        order.append({"$addFields": {"_score": {"$add": [
+            text_score, {"$multiply": [{"$ifNull": ["$bayesian_rating", "$rating", 0]}, SEARCH_RATING_WEIGHT]}
+        ]}}})
+        sort_spec = {"_score": -1, "_id": 1}
+    else:
+        sort_spec = {"_id": 1}
+    if online_first and not filters.available_now:
+        order.append({"$addFields": {"_online": {"$eq": ["$status", AvailabilityStatus.ONLINE.value]}}})
+        sort_spec = {"_online": -1, **sort_spec}
+    page = order + [{"$sort": sort_spec}, {"$skip": skip}, {"$limit": limit}]
+
+    if not with_facets:
+        pipeline = [{"$match": {**search_match, **filters.to_match()}}] + page
+        docs = await secondary_aggregate(User, pipeline).to_list()
+        return [User.model_validate(doc) for doc in docs], None
+
+    pipeline = [
+        {"$match": search_match},
+        {"$facet": {"items": [{"$match": filters.to_match()}] + page, **facet_pipelines(filters)}},
+    ]
+    result = (await secondary_aggregate(User, pipeline).to_list())[0]
+    users = [User.model_validate(doc) for doc in result.pop("items")]
+    facets = format_facets({
+        facet: [(row["_id"], row["count"]) for row in rows] for facet, rows in result.items()
+    })
+    return users, facets
+
+@router.get("", response_model=List[PublicUserResponse])
+async def get_users_by_ids(
+    ids: str = Query(..., description="Comma-separated user ids"),
+) -> Any:
+    return await lookup_users(ids.split(","))
+
+@router.post("/batch", response_model=List[PublicUserResponse])
+async def get_users_batch(batch: UserBatchRequest) -> Any:
+    # Same as GET /users?ids=, for lists too long for a query string
+    return await lookup_users(batch.ids)
+
 @router.put("/profile", response_model=UserResponse)
 async def update_user_profile(
     user_in: UserUpdate,
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
-    # Update fields
+    # Update only the fields sent: a full save() would write back this
+    # request's copy of fields others update atomically (ratings, credits)
+    changes = {}
     if user_in.first_name:
-        current_user.first_name = user_in.first_name
+        changes["first_name"] = user_in.first_name
     if user_in.last_name:
-        current_user.last_name = user_in.last_name
+        changes["last_name"] = user_in.last_name
     if user_in.headline:
-        current_user.headline = user_in.headline
+        changes["headline"] = user_in.headline
     if user_in.bio:
-        current_user.bio = user_in.bio
+        changes["bio"] = user_in.bio
     if user_in.skills is not None:
-        current_user.skills = user_in.skills
+        changes["skills"] = user_in.skills
     if user_in.price_per_minute is not None:
-        current_user.price_per_minute = user_in.price_per_minute
+        changes["price_per_minute"] = user_in.price_per_minute
     if user_in.timezone:
-        current_user.timezone = user_in.timezone
+        changes["timezone"] = user_in.timezone
     if user_in.status:
-        current_user.status = user_in.status
-        
-    await current_user.save()
+        changes["status"] = user_in.status
+    if user_in.notification_delivery:
+        changes["notification_delivery"] = user_in.notification_delivery
+
+    if changes:
+        for field, value in changes.items():
+            setattr(current_user, field, value)
+        current_user.refresh_search_keys()
+        await current_user.set({
+            **changes, "search_keys": current_user.search_keys, "keywords": current_user.keywords
+        })
+    await invalidate_users([current_user.id])
     return user_to_response(current_user)
 
 @router.post("/topup", response_model=UserResponse)
@@ -55,45 +178,93 @@ async def topup_credits(
             detail=f"Credit limit exceeded. Maximum balance is ${MAX_CREDITS:,.0f}. Current balance: ${current_user.credits:,.2f}"
         )
     
-    current_user.credits += amount
-    await current_user.save()
+    await current_user.inc({User.credits: amount})
+    await invalidate_users([current_user.id])
     return user_to_response(current_user)
 
-@router.get("/consultants", response_model=List[UserResponse])
+@router.get("/consultants", response_model=Union[List[PublicUserResponse], ConsultantSearchResponse])
 async def search_consultants(
+    request: Request,
     skip: int = 0,
     limit: int = 10,
     search: Optional[str] = None,
     skills: Optional[List[str]] = Query(None),
     category: Optional[str] = None,
+    prefix: bool = Query(False, description="Treat the last search term as a prefix (typeahead)"),
+    min_price: Optional[float] = Query(None, description="Minimum price per minute"),
+    max_price: Optional[float] = Query(None, description="Price per minute below this (exclusive, as in price bands)"),
+    sort: Optional[ConsultantSort] = Query(None, description="Order by (Bayesian) rating, price, review_count or newest"),
+    available_now: bool = Query(False, description="Only consultants who are online right now"),
+    online_first: bool = Query(False, description="List online consultants ahead of the rest"),
+    facets: bool = Query(False, description="Also return counts per category, skill, price band and status"),
 ) -> Any:
-    query = User.find(User.role == UserRole.CONSULTANT)
-    
-    if category and category != "All":
-        query = query.find(User.category == category)
-    
-    if search:
-        # Simple regex search for name or headline
-        # Use re.escape to prevent regex injection/errors
-        safe_search = re.escape(search)
-        query = query.find({
-            "$or": [
-                {"first_name": {"$regex": safe_search, "$options": "i"}},
-                {"last_name": {"$regex": safe_search, "$options": "i"}},
-                {"headline": {"$regex": safe_search, "$options": "i"}},
-                {"skills": {"$in": [search]}} # Keep original for exact match in array
-            ]
-        })
-        
-    if skills:
-        query = query.find({"skills": {"$all": skills}})
-        
-    users = await query.skip(skip).limit(limit).to_list()
-    return [user_to_response(u) for u in users]
-
-@router.get("/{user_id}", response_model=UserResponse)
-async def get_user_by_id(user_id: str) -> Any:
-    user = await User.get(user_id)
-    if not user:
+    async def compute() -> Any:
+        filters = ConsultantFilters(
+            category=category if category and category != "All" else None,
+            skills=skills,
+            min_price=min_price,
+            max_price=max_price,
+            available_now=available_now,
+        )
+
+        # Relevance ranking needs the text index; everything else is served from
+        # the in-memory catalog when it's loaded
+        if not (search and normalize_search_text(search)):
+            results = catalog_service.query(
+                filters, sort=sort, online_first=online_first, skip=skip, limit=limit
+            )
+            if results is not None:
+                if facets:
+                    return {"items": results, "facets": catalog_service.facets(filters)}
+                return results
+
+        users, facet_counts = await query_consultants(
+            filters, search, prefix, skip, limit,
+            sort=sort, online_first=online_first, with_facets=facets
+        )
+        items = [user_to_response(u) for u in users]
+        if facets:
+            return {"items": items, "facets": facet_counts}
+        return items
+
+    return await response_cache.respond(
+        request, compute, Union[List[PublicUserResponse], ConsultantSearchResponse], tags=[CATALOG_TAG]
+    )
+
+@router.get("/skills/suggest", response_model=List[SkillSuggestion])
+async def suggest_skills(
+    prefix: str = Query("", description="What the user has typed so far"),
+    limit: int = Query(10, ge=1, le=50),
+) -> Any:
+    # Answered from the catalog's skill index, never from MongoDB
+    return catalog_service.suggest_skills(prefix, limit)
+
+@router.get("/{user_id}/similar", response_model=List[PublicUserResponse])
+async def get_similar_consultants(
+    user_id: str,
+    limit: int = Query(5, ge=1, le=20),
+    available_now: bool = Query(False, description="Only consultants who are online right now"),
+    max_price: Optional[float] = Query(None, description="Price per minute below this (exclusive, as in price bands)"),
+) -> Any:
+    results = similarity_service.similar(user_id, limit, available_now, max_price)
+    if results is not None:
+        return results
+    # Not in the index: either not a consultant, or not indexed yet (no build
+    # so far, or added since the last one)
+    if not PydanticObjectId.is_valid(user_id):
         raise HTTPException(status_code=404, detail="User not found")
-    return user_to_response(user)
+    user = await User.get(PydanticObjectId(user_id))
+    if not user or user.role != UserRole.CONSULTANT:
+        raise HTTPException(status_code=404, detail="User not found")
+    return []
+
+# Publicly cacheable, so only the public profile: no email, credits or settings
+@router.get("/{user_id}", response_model=PublicUserResponse)
+async def get_user_by_id(user_id: str, request: Request) -> Any:
+    async def compute() -> Any:
+        user = await User.get(user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user_to_response(user)
+
+    return await response_cache.respond(request, compute, PublicUserResponse, tags=[user_tag(user_id)])
@@ -0,0 +1,257 @@
+"""
+In-process caching utilities
+"""
+import asyncio
+import hashlib
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set
+
+from pydantic import TypeAdapter
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Callbacks that drop cached copies of users, called with the ids of users
+# whose documents changed (including changes that bypass `User.save`)
+_user_invalidation_hooks: List[Callable[[List[str]], Any]] = []
+
+
+def on_users_changed(hook: Callable[[List[str]], Any]) -> Callable[[List[str]], Any]:
+    """Register a (sync or async) user invalidation hook; usable as a decorator"""
+    _user_invalidation_hooks.append(hook)
+    return hook
+
+
+async def invalidate_users(user_ids: Iterable[Any]) -> None:
+    """Run every registered invalidation hook for the given users"""
+    ids = [str(user_id) for user_id in user_ids]
+    if not ids:
+        return
+    for hook in _user_invalidation_hooks:
+        try:
+            result = hook(ids)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"User invalidation hook {hook!r} failed: {e}")
+
+
+class _CacheEntry:
+    __slots__ = ("value", "stored_at")
+
+    def __init__(self, value: Any, stored_at: float):
+        self.value = value
+        self.stored_at = stored_at
+
+
+class SWRCache:
+    """
+    Small in-process cache with stale-while-revalidate semantics.
+
+    - Entries younger than `ttl` are served as-is.
+    - Entries younger than `ttl + stale_ttl` are served immediately while a
+      background task recomputes them.
+    - Misses wait for the computation. Concurrent misses (and refreshes) for
+      the same key share one in-flight computation (single-flight).
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, _CacheEntry] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # Bumped on invalidation so refreshes started earlier don't re-store
+        # values computed from pre-invalidation data
+        self._generation = 0
+
+    async def get(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        fresh: bool = False
+    ) -> Any:
+        """Return the cached value for `key`, computing it when needed"""
+        if fresh:
+            # Bypass the cache, but let the exact figures serve later readers
+            value = await compute()
+            self._store(key, value)
+            return value
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if age < self.ttl:
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self._refresh(key, compute)
+                return entry.value
+
+        # Shield the shared task so one cancelled request doesn't cancel it
+        # for everyone else waiting on the same key
+        return await asyncio.shield(self._refresh(key, compute))
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> None:
+        """Drop every entry (or those whose key matches `predicate`)"""
+        self._generation += 1
+        if predicate is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if predicate(k)]:
+            del self._entries[key]
+
+    def _refresh(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute_and_store(key, compute))
+            task.add_done_callback(lambda t: self._on_refresh_done(key, t))
+            self._inflight[key] = task
+        return task
+
+    async def _compute_and_store(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation
+        value = await compute()
+        if generation == self._generation:
+            self._store(key, value)
+        return value
+
+    def _on_refresh_done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Background refreshes have no awaiter, so surface their failures here
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Cache refresh failed for {key!r}: {task.exception()}")
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = _CacheEntry(value, time.monotonic())
+        while len(self._entries) > self.max_entries:
+            # Dicts keep insertion order, so the first key is the oldest write
+            del self._entries[next(iter(self._entries))]
+
+
+# Response cache tags
+CATALOG_TAG = "catalog"
+
+
+def user_tag(user_id: Any) -> str:
+    return f"user:{user_id}"
+
+
+class _CachedResponse:
+    __slots__ = ("body", "etag", "tags", "stored_at")
+
+    def __init__(self, body: bytes, tags: FrozenSet[str], stored_at: float):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.tags = tags
+        self.stored_at = stored_at
+
+
+class ResponseCache:
+    """
+    Pre-encoded JSON bodies for public GET endpoints whose output is the
+    same for every caller, keyed by path and normalized query string.
+    Entries carry tags and are dropped when any of their tags is
+    invalidated, so hits need neither a database query nor serialization.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 2048):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, _CachedResponse] = {}
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self._adapters: Dict[Any, TypeAdapter] = {}
+        # Bumped on invalidation so responses computed from older data are
+        # served but not stored
+        self._generation = 0
+
+    @staticmethod
+    def key(request: Request) -> str:
+        return request.url.path + "?" + "&".join(
+            f"{name}={value}" for name, value in sorted(request.query_params.multi_items())
+        )
+
+    async def respond(
+        self,
+        request: Request,
+        compute: Callable[[], Awaitable[Any]],
+        response_type: Any,
+        tags: Iterable[str]
+    ) -> Response:
+        """
+        Serve `request` from the cache, or compute, validate against
+        `response_type` and encode the payload once, then cache it
+        """
+        key = self.key(request)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.stored_at < self.ttl:
+            return self._response(request, entry)
+
+        generation = self._generation
+        payload = await compute()
+        adapter = self._adapters.get(response_type)
+        if adapter is None:
+            adapter = self._adapters[response_type] = TypeAdapter(response_type)
+        body = adapter.dump_json(adapter.validate_python(payload))
+
+        entry = _CachedResponse(body, frozenset(tags), time.monotonic())
+        if generation == self._generation:
+            self._store(key, entry)
+        return self._response(request, entry)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        self._generation += 1
+        for tag in tags:
+            for key in self._keys_by_tag.pop(tag, ()):
+                self._drop(key)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+    def _response(self, request: Request, entry: _CachedResponse) -> Response:
+        headers = {
+            "Cache-Control": f"public, max-age={int(self.ttl)}",
+            "Vary": "Accept-Encoding",
+            "ETag": entry.etag,
+        }
+        if request.headers.get("if-none-match") == entry.etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def _store(self, key: str, entry: _CachedResponse) -> None:
+        self._drop(key)
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            # Dicts keep insertion order, so the first key is the oldest write
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+# Singleton instance
+response_cache = ResponseCache(ttl=settings.PUBLIC_CACHE_TTL_SECONDS)
+
+
+@on_users_changed
+def _invalidate_user_responses(user_ids: List[str]) -> None:
+    # Listings are invalidated by the catalog once its snapshot has changed
+    response_cache.invalidate_tags(user_tag(user_id) for user_id in user_ids)
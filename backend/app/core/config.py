@@ -17,6 +17,18 @@ class Settings(BaseSettings):
     # Database
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "micro_consulting"
+    # Connection pool, per process; requests waiting longer than
+    # WAIT_QUEUE_TIMEOUT for a free connection fail instead of piling up
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0  # Connections kept open while idle
+    MONGODB_MAX_IDLE_TIME_MS: int = 300000
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 10000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 30000
+    MONGODB_SOCKET_TIMEOUT_MS: int = 30000
+    # Where admin analytics, exports and discovery scans read from; falls
+    # back to the primary when there is no secondary
+    MONGODB_SECONDARY_READ_PREFERENCE: str = "secondaryPreferred"
 
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
@@ -37,15 +49,55 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: Optional[str] = None
     EMAILS_FROM_EMAIL: Optional[str] = "noreply@microconsult.com"
     EMAILS_FROM_NAME: str = "MicroConsult"
+    SMTP_START_TLS: bool = True
+    # Pooled SMTP connections
+    SMTP_POOL_SIZE: int = 3
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_IDLE_TIMEOUT_SECONDS: int = 60
+    # Email queue, delivered by email_worker.py processes so SMTP latency and
+    # failures stay out of the API. EMAIL_QUEUE_INLINE_WORKER=True delivers it
+    # from the API process instead (local development)
+    EMAIL_MAX_ATTEMPTS: int = 6
+    EMAIL_RETRY_BASE_SECONDS: int = 30
+    EMAIL_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_QUEUE_POLL_SECONDS: float = 2.0
+    EMAIL_WORKER_CONCURRENCY: int = 4
+    EMAIL_QUEUE_INLINE_WORKER: bool = False
+    # Users who chose digest delivery get one email per window
+    EMAIL_DIGEST_WINDOW_SECONDS: int = 300
+    EMAIL_DIGEST_MAX_ITEMS: int = 50
     
-    # TURN Server Configuration (for WebRTC)
+    # TURN Server Configuration (for WebRTC). With TURN_SECRET (the TURN
+    # server's REST API / static-auth-secret) each user gets short-lived
+    # credentials; otherwise the static username/credential are shared
     TURN_SERVER_URL: Optional[str] = None
     TURN_SERVER_USERNAME: Optional[str] = None
     TURN_SERVER_CREDENTIAL: Optional[str] = None
+    TURN_SECRET: Optional[str] = None
+    TURN_CREDENTIAL_TTL_SECONDS: int = 43200
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     
+    # Admin dashboard cache (stale-while-revalidate)
+    ADMIN_CACHE_TTL_SECONDS: int = 60
+    ADMIN_CACHE_STALE_SECONDS: int = 300
+    
+    # In-memory consultant catalog; full rebuild interval (picks up writes
+    # made by other worker processes)
+    CATALOG_REFRESH_SECONDS: int = 300
+    
+    # Similar-consultant vectors; rebuild interval when the catalog changed
+    SIMILARITY_REFRESH_SECONDS: int = 120
+    
+    # Bayesian rating prior: a consultant's score starts at PRIOR_MEAN and
+    # counts as PRIOR_WEIGHT reviews until real reviews outweigh it
+    RATING_PRIOR_MEAN: float = 4.0
+    RATING_PRIOR_WEIGHT: float = 5.0
+    
+    # Cached public responses (consultant listings, profiles, reviews)
+    PUBLIC_CACHE_TTL_SECONDS: int = 30
+    
     # Environment
     ENVIRONMENT: str = "development"
     
@@ -53,18 +105,6 @@ class Settings(BaseSettings):
     def is_production(self) -> bool:
         return self.ENVIRONMENT == "production"
     
-    @property
-    def ice_servers(self) -> List[dict]:
-        """Return ICE servers configuration for WebRTC"""
-        servers = [{"urls": "stun:stun.l.google.com:19302"}]
-        if self.TURN_SERVER_URL and self.TURN_SERVER_USERNAME:
-            servers.append({
-                "urls": self.TURN_SERVER_URL,
-                "username": self.TURN_SERVER_USERNAME,
-                "credential": self.TURN_SERVER_CREDENTIAL
-            })
-        return servers
-    
     # Google OAuth
     GOOGLE_CLIENT_ID: str = os.environ.get("GOOGLE_CLIENT_ID", "")
     GOOGLE_CLIENT_SECRET: str = os.environ.get("GOOGLE_CLIENT_SECRET", "")
@@ -1,26 +1,146 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from beanie import init_beanie
+from pymongo import monitoring
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
 import certifi
 from app.core.config import settings
 from app.models.user import User
 from app.models.session import Session
 from app.models.review import Review
 from app.models.message import Message
+from app.models.daily_stats import DailyStats
+from app.models.email_job import EmailJob
+from app.models.bulk_job import BulkJob
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """
+    Live connection-pool counters per server, kept from the driver's
+    connection pool events (which arrive on driver threads, hence the lock).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers: Dict[Tuple[str, int], Dict[str, int]] = {}
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            servers = [(address, dict(counters)) for address, counters in self._servers.items()]
+        return [
+            {
+                "address": f"{host}:{port}",
+                "open": c["open"],
+                "in_use": c["in_use"],
+                "idle": c["open"] - c["in_use"],
+                "waiting": c["waiting"],
+                "utilization": round(c["in_use"] / settings.MONGODB_MAX_POOL_SIZE, 3),
+                "checkout_timeouts": c["checkout_timeouts"],
+                "checkout_failures": c["checkout_failures"],
+            }
+            for (host, port), c in sorted(servers)
+        ]
+
+    def _update(self, address: Tuple[str, int], **deltas: int) -> None:
+        with self._lock:
+            counters = self._servers.setdefault(address, dict.fromkeys(
+                ("open", "in_use", "waiting", "checkout_timeouts", "checkout_failures"), 0
+            ))
+            for name, delta in deltas.items():
+                counters[name] += delta
+
+    def pool_created(self, event):
+        self._update(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(event.address, None)
+
+    def connection_created(self, event):
+        self._update(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._update(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        timed_out = int(event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT)
+        self._update(event.address, waiting=-1, checkout_failures=1, checkout_timeouts=timed_out)
+
+    def connection_checked_out(self, event):
+        self._update(event.address, waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, in_use=-1)
+
+
+pool_stats = PoolStats()
+
+client: Optional[AsyncIOMotorClient] = None
+
+# Same database, read with MONGODB_SECONDARY_READ_PREFERENCE; see secondary_aggregate
+secondary_db: Optional[AsyncIOMotorDatabase] = None
+
+
+def secondary_aggregate(model, pipeline: List[dict], **kwargs: Any):
+    """
+    Run an aggregation on `model`'s collection for heavy, read-only work
+    that tolerates replication lag (admin analytics, exports, discovery),
+    keeping it off the primary when a secondary is available. Returns raw
+    documents, through a cursor supporting `async for` and `to_list()`.
+
+    Before `init_db` has run (scripts calling `init_beanie` themselves),
+    this reads from the database the model was initialized with.
+    """
+    if secondary_db is None:
+        return model.get_motor_collection().aggregate(pipeline, **kwargs)
+    return secondary_db[model.get_collection_name()].aggregate(pipeline, **kwargs)
+
+
+def secondary_database(client: AsyncIOMotorClient) -> AsyncIOMotorDatabase:
+    """The application database, read with MONGODB_SECONDARY_READ_PREFERENCE"""
+    return client.get_database(
+        settings.DATABASE_NAME,
+        read_preference=make_read_preference(
+            read_pref_mode_from_name(settings.MONGODB_SECONDARY_READ_PREFERENCE), None
+        ),
+    )
+
 
 async def init_db():
     """
     Initialize MongoDB connection.
     Uses simplified SSL configuration for Python 3.13 compatibility.
     """
+    global client, secondary_db
+    
     # For Python 3.13 compatibility, use minimal TLS configuration
     # Let MongoDB driver handle SSL/TLS automatically from connection string
     # TEMPORARY: Allow invalid certificates until Python 3.11 is used
     client = AsyncIOMotorClient(
         settings.MONGODB_URL,
         tlsAllowInvalidCertificates=True,  # Bypass strict Python 3.13 SSL validation
-        serverSelectionTimeoutMS=30000,  # 30 seconds for initial connection
-        connectTimeoutMS=30000,
-        socketTimeoutMS=30000,
+        serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=settings.MONGODB_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=settings.MONGODB_SOCKET_TIMEOUT_MS,
+        maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        event_listeners=[pool_stats],
     )
     
     # Test connection
@@ -32,4 +152,17 @@ async def init_db():
         print(f"Connection string (sanitized): {settings.MONGODB_URL.split('@')[1] if '@' in settings.MONGODB_URL else 'invalid'}")
         raise
     
-    await init_beanie(database=client[settings.DATABASE_NAME], document_models=[User, Session, Review, Message])
+    secondary_db = secondary_database(client)
+    
+    await init_beanie(database=client[settings.DATABASE_NAME], document_models=[User, Session, Review, Message, DailyStats, EmailJob, BulkJob])
+
+
+def pool_status() -> Dict[str, Any]:
+    """Connection pool settings and per-server utilization"""
+    return {
+        "max_pool_size": settings.MONGODB_MAX_POOL_SIZE,
+        "min_pool_size": settings.MONGODB_MIN_POOL_SIZE,
+        "wait_queue_timeout_ms": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "secondary_read_preference": settings.MONGODB_SECONDARY_READ_PREFERENCE,
+        "servers": pool_stats.snapshot(),
+    }
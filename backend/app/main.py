@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
@@ -9,6 +10,10 @@ from slowapi.errors import RateLimitExceeded
 from app.core.config import settings
 from app.db.mongodb import init_db
 from app.api.v1.api import api_router
+from app.services.catalog_service import catalog_service
+from app.services.similarity_service import similarity_service
+from app.services.email_service import email_service
+from app.services.email_queue_service import email_queue_service
 from contextlib import asynccontextmanager
 
 # Setup logging
@@ -21,6 +26,16 @@ limiter = Limiter(key_func=get_remote_address)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await catalog_service.start()
+    await similarity_service.start()
+    # Dedicated email_worker.py processes deliver queued emails; local
+    # development can opt into delivering them in-process
+    email_worker = None
+    email_worker_stop = asyncio.Event()
+    if settings.EMAIL_QUEUE_INLINE_WORKER:
+        email_worker = asyncio.create_task(
+            email_queue_service.run_worker(email_worker_stop, concurrency=settings.EMAIL_WORKER_CONCURRENCY)
+        )
     # Debug: Print registered routes on startup
     print("--- Registered Routes ---")
     for route in app.routes:
@@ -32,6 +47,12 @@ async def lifespan(app: FastAPI):
                 print(f"{route.path} [WebSocket]")
     print("-------------------------")
     yield
+    if email_worker:
+        email_worker_stop.set()
+        await email_worker
+    await similarity_service.stop()
+    await catalog_service.stop()
+    await email_service.close()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -114,6 +135,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],  # Specific methods only
     allow_headers=["Authorization", "Content-Type", "Accept"],  # Specific headers only
+    expose_headers=["X-Search-Truncated"],  # Set by admin user search
     max_age=600,  # Cache preflight requests for 10 minutes
 )
 
@@ -0,0 +1,35 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+class BulkJobStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class BulkJob(Document):
+    """
+    Progress of one bulk admin action over users, updated as each chunk
+    completes so any API process can report it. A job whose process died
+    stays RUNNING; `updated_at` shows when it last made progress.
+    """
+    action: str
+    status: BulkJobStatus = BulkJobStatus.RUNNING
+    total: int = 0
+    processed: int = 0
+    modified: int = 0
+    error: Optional[str] = None
+
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "bulk_jobs"
+        indexes = [
+            # Finished jobs are only kept for a week
+            IndexModel([("finished_at", 1)], expireAfterSeconds=7 * 24 * 3600),
+        ]
@@ -0,0 +1,29 @@
+from typing import Dict
+from beanie import Document, Indexed
+
+
+class DailyStats(Document):
+    """
+    Materialized per-day platform counters, keyed by UTC date (YYYY-MM-DD).
+    Every counter is also tracked per UTC quarter hour in `quarter_hours`
+    so analytics can re-bucket days on any time zone's boundaries, including
+    half- and quarter-hour offsets like UTC+05:30 and UTC+05:45.
+    """
+    date: Indexed(str, unique=True)
+    
+    revenue: float = 0.0
+    sessions_completed: int = 0
+    signups: int = 0
+    new_clients: int = 0
+    new_consultants: int = 0
+    reviews: int = 0
+    rating_sum: int = 0
+    
+    # Quarter of the UTC day (0-95) -> counters, e.g.
+    # {"52": {"revenue": 42.0, "sessions_completed": 3}, ...}
+    quarter_hours: Dict[str, Dict[str, float]] = {}
+    # Per UTC hour, as written before quarter hours; dropped by a rebuild
+    hourly: Dict[str, Dict[str, float]] = {}
+
+    class Settings:
+        name = "daily_stats"
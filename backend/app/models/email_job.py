@@ -0,0 +1,44 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+from beanie import Document, Indexed, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel
+
+class EmailJobStatus(str, Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    SKIPPED = "skipped"  # Email isn't configured
+    DEAD = "dead"  # Gave up after the maximum number of attempts
+
+class EmailJob(Document):
+    """
+    One queued notification email. Workers claim jobs with a lease
+    (`locked_until`), so a job held by a crashed worker is picked up again.
+    """
+    kind: str  # Which EmailService notification to send
+    params: Dict[str, Any] = {}
+    # Enqueueing the same key twice sends one email
+    idempotency_key: Indexed(str, unique=True)
+    # Set for users on digest delivery: their pending jobs are sent together
+    digest_for: Optional[PydanticObjectId] = None
+    
+    status: EmailJobStatus = EmailJobStatus.PENDING
+    attempts: int = 0
+    run_after: datetime = Field(default_factory=datetime.utcnow)
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: Optional[datetime] = None
+
+    class Settings:
+        name = "email_jobs"
+        indexes = [
+            [("status", 1), ("run_after", 1)],  # Due jobs
+            [("status", 1), ("locked_until", 1)],  # Expired leases
+            [("digest_for", 1), ("status", 1)],  # A user's pending digest items
+            # Sent jobs are only kept for a week
+            IndexModel([("sent_at", 1)], expireAfterSeconds=7 * 24 * 3600),
+        ]
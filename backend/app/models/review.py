@@ -1,6 +1,8 @@
 from datetime import datetime
+from typing import Optional
 from beanie import Document, Link, PydanticObjectId
 from pydantic import Field
+from pymongo import IndexModel
 from app.models.user import User
 from app.models.session import Session
 
@@ -11,7 +13,18 @@ class Review(Document):
     rating: int = Field(ge=1, le=5)
     comment: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    # Snapshot of the client's profile when the review was written, so
+    # review feeds don't have to look up every author
+    client_name: Optional[str] = None
+    client_avatar_url: Optional[str] = None
 
     class Settings:
         name = "reviews"
+        indexes = [
+            # One review per session; enforced here rather than by a lookup
+            IndexModel([("session.$id", 1)], unique=True, name="one_review_per_session"),
+            # Newest-first review feed per consultant (see get_consultant_reviews)
+            [("consultant.$id", 1), ("created_at", -1), ("_id", -1)],
+        ]
 
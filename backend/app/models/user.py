@@ -1,8 +1,12 @@
-from typing import List, Optional
+import re
+import unicodedata
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
-from beanie import Document, Indexed
+from beanie import Document, Indexed, Insert, Replace, Save, SaveChanges, before_event
 from pydantic import BaseModel, EmailStr, Field
+from pymongo import IndexModel, TEXT
+from app.core.config import settings
 
 class UserRole(str, Enum):
     CLIENT = "client"
@@ -14,6 +18,58 @@ class AvailabilityStatus(str, Enum):
     OFFLINE = "offline"
     BUSY = "busy"
 
+class NotificationDelivery(str, Enum):
+    IMMEDIATE = "immediate"
+    DIGEST = "digest"  # Session updates batched into one email per window
+
+class ConsultantSort(str, Enum):
+    RATING = "rating"
+    PRICE = "price"
+    REVIEW_COUNT = "review_count"
+    NEWEST = "newest"
+
+# Field and direction behind each discovery sort; ties are broken on _id
+CONSULTANT_SORT_FIELDS = {
+    ConsultantSort.RATING: ("bayesian_rating", -1),
+    ConsultantSort.PRICE: ("price_per_minute", 1),
+    ConsultantSort.REVIEW_COUNT: ("review_count", -1),
+    ConsultantSort.NEWEST: ("created_at", -1),
+}
+
+def compute_bayesian_rating(rating_total: float, review_count: int) -> float:
+    """Mean rating shrunk towards the prior, so a few reviews can't top the charts"""
+    return (
+        (settings.RATING_PRIOR_MEAN * settings.RATING_PRIOR_WEIGHT + rating_total)
+        / (settings.RATING_PRIOR_WEIGHT + review_count)
+    )
+
+def normalize_search_text(value: str) -> str:
+    """Lowercase and strip accents so "José" matches a search for "jose" """
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).strip()
+
+
+def build_search_keys(email: str, first_name: str, last_name: str) -> List[str]:
+    """
+    Normalized strings that admin search matches by prefix: the email, its
+    local part, each name word and the full name.
+    """
+    email = normalize_search_text(email)
+    full_name = normalize_search_text(f"{first_name} {last_name}")
+    keys = {email, email.split("@")[0], full_name, *full_name.split()}
+    keys.discard("")
+    return sorted(keys)
+
+
+def build_keywords(*texts: Optional[str]) -> List[str]:
+    """Distinct normalized words, used for typeahead prefix matching"""
+    words = set()
+    for text in texts:
+        if text:
+            words.update(re.findall(r"\w[\w+#.-]*", normalize_search_text(text)))
+    return sorted(words)
+
+
 class User(Document):
     email: Indexed(EmailStr, unique=True)
     hashed_password: str
@@ -36,11 +92,15 @@ class User(Document):
     # New UI fields
     rating: float = 5.0
     review_count: int = 0
+    rating_total: Optional[float] = None  # Sum of all review stars; see reviews.create_review
+    rating_histogram: Dict[str, int] = {}  # Reviews per star, keyed "1" to "5"
+    bayesian_rating: float = Field(default_factory=lambda: compute_bayesian_rating(0, 0))
     category: str = "Development"
     avatar_url: Optional[str] = None
     
     status: AvailabilityStatus = AvailabilityStatus.OFFLINE
     timezone: str = "UTC"
+    notification_delivery: NotificationDelivery = NotificationDelivery.IMMEDIATE
     
     # OAuth fields
     oauth_provider: Optional[str] = None  # "google", "github", etc.
@@ -49,9 +109,44 @@ class User(Document):
     
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    # Maintained on save; see build_search_keys and build_keywords
+    search_keys: List[str] = []
+    keywords: List[str] = []
+
+    @before_event(Insert, Replace, Save, SaveChanges)
+    def refresh_search_keys(self):
+        self.search_keys = build_search_keys(self.email, self.first_name, self.last_name)
+        self.keywords = build_keywords(self.first_name, self.last_name, self.headline, *self.skills)
 
     class Settings:
         name = "users"
         indexes = [
             [("oauth_provider", 1), ("oauth_id", 1)],  # Composite unique index
+            [("search_keys", 1)],  # Anchored prefix lookups for admin search
+            [("role", 1), ("keywords", 1)],  # Typeahead prefix lookups for discovery
+            IndexModel(
+                [
+                    ("first_name", TEXT),
+                    ("last_name", TEXT),
+                    ("headline", TEXT),
+                    ("bio", TEXT),
+                    ("skills", TEXT),
+                ],
+                weights={"first_name": 10, "last_name": 10, "skills": 8, "headline": 5, "bio": 1},
+                default_language="english",
+                name="consultant_text_search",
+            ),
+            # Sorted discovery, with and without a category filter
+            *[
+                [("role", 1), *([("category", 1)] if by_category else []), sort_key, ("_id", 1)]
+                for sort_key in CONSULTANT_SORT_FIELDS.values()
+                for by_category in (False, True)
+            ],
+            # Only the few consultants online right now, for available_now
+            IndexModel(
+                [("category", 1), ("price_per_minute", 1), ("_id", 1)],
+                partialFilterExpression={"role": UserRole.CONSULTANT.value, "status": AvailabilityStatus.ONLINE.value},
+                name="online_consultants",
+            ),
         ]
@@ -13,6 +13,7 @@ class ReviewCreate(ReviewBase):
 class ReviewResponse(ReviewBase):
     id: Optional[str] = None
     client_name: str
+    client_avatar_url: Optional[str] = None
     created_at: datetime
 
     model_config = ConfigDict(
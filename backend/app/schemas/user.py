@@ -1,7 +1,7 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from beanie import PydanticObjectId
-from app.models.user import UserRole, AvailabilityStatus
+from app.models.user import UserRole, AvailabilityStatus, NotificationDelivery
 
 # Shared properties
 class UserBase(BaseModel):
@@ -27,6 +27,7 @@ class UserUpdate(BaseModel):
     status: Optional[AvailabilityStatus] = None
     category: Optional[str] = None
     avatar_url: Optional[str] = None
+    notification_delivery: Optional[NotificationDelivery] = None
 
 class UserLogin(BaseModel):
     email: EmailStr
@@ -51,8 +52,50 @@ class UserResponse(UserBase):
     free_minutes: int = 15
     status: AvailabilityStatus
     timezone: str
+    notification_delivery: NotificationDelivery = NotificationDelivery.IMMEDIATE
     rating: float = 5.0
     review_count: int = 0
+    rating_histogram: Dict[str, int] = {}
+    bayesian_rating: Optional[float] = None
     category: str = "Development"
     avatar_url: Optional[str] = None
     credits: float = 0.0
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+    # Set on price bands, ready to pass back as min_price / max_price
+    # (max_price is exclusive, so adjacent bands don't overlap)
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+# Profile fields anyone may see (no email or credit balance)
+class PublicUserResponse(BaseModel):
+    id: str
+    first_name: str
+    last_name: str
+    role: UserRole
+    headline: Optional[str] = None
+    bio: Optional[str] = None
+    skills: List[str] = []
+    price_per_minute: Optional[float] = None
+    free_minutes: int = 15
+    status: AvailabilityStatus = AvailabilityStatus.OFFLINE
+    timezone: str = "UTC"
+    rating: float = 5.0
+    review_count: int = 0
+    rating_histogram: Dict[str, int] = {}
+    bayesian_rating: Optional[float] = None
+    category: str = "Development"
+    avatar_url: Optional[str] = None
+
+class ConsultantSearchResponse(BaseModel):
+    items: List[PublicUserResponse]
+    facets: Dict[str, List[FacetCount]]
+
+class SkillSuggestion(BaseModel):
+    skill: str
+    count: int  # Consultants listing it
+
+class UserBatchRequest(BaseModel):
+    ids: List[str]
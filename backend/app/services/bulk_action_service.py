@@ -0,0 +1,134 @@
+"""
+Bulk Action Service - Admin actions applied to many users at once
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from beanie import PydanticObjectId
+from beanie.operators import Inc, Set
+from pydantic import BaseModel
+
+from app.core.cache import invalidate_users
+from app.models.bulk_job import BulkJob, BulkJobStatus
+from app.models.user import User, AvailabilityStatus
+
+logger = logging.getLogger(__name__)
+
+# Users updated per update_many; larger targets run as a background job
+BULK_CHUNK_SIZE = 1000
+
+class BulkActionJob(BaseModel):
+    id: str
+    action: str
+    status: BulkJobStatus = BulkJobStatus.RUNNING
+    total: int = 0
+    processed: int = 0
+    modified: int = 0
+    error: Optional[str] = None
+    started_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_job(cls, job: BulkJob) -> "BulkActionJob":
+        return cls(id=str(job.id), **job.model_dump(exclude={"id", "revision_id"}))
+
+
+class BulkActionService:
+    """
+    Runs bulk user updates in id-ordered chunks. Progress is kept in the
+    `bulk_jobs` collection, so status polls work from any API process and
+    across restarts.
+    """
+
+    def __init__(self):
+        # Keeps background jobs referenced until they finish
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def build_update(action: str, value: Optional[float] = None) -> dict:
+        """Translate an admin action into a MongoDB update document"""
+        if action == "activate":
+            return {"$set": {"is_active": True}}
+        if action == "deactivate":
+            return {"$set": {"is_active": False}}
+        if action == "set_offline":
+            return {"$set": {"status": AvailabilityStatus.OFFLINE.value}}
+        if action == "adjust_credits":
+            if value is None:
+                raise ValueError("Value required for credit adjustment")
+            return {"$inc": {"credits": value}}
+        raise ValueError(f"Unknown action: {action}")
+
+    async def start(self, action: str, match: dict, value: Optional[float] = None) -> BulkActionJob:
+        """
+        Apply `action` to every user matching `match`. Targets that fit in one
+        chunk are updated before returning; larger ones continue in the
+        background and report progress through `get_job`.
+        """
+        update = self.build_update(action, value)
+        job = BulkJob(action=action, total=await User.find(match).count())
+        await job.insert()
+
+        if job.total <= BULK_CHUNK_SIZE:
+            await self._run(job, match, update)
+        else:
+            job_id = str(job.id)
+            task = asyncio.create_task(self._run(job, match, update))
+            self._tasks[job_id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return BulkActionJob.from_job(job)
+
+    async def get_job(self, job_id: str) -> Optional[BulkActionJob]:
+        if not PydanticObjectId.is_valid(job_id):
+            return None
+        job = await BulkJob.get(PydanticObjectId(job_id))
+        return BulkActionJob.from_job(job) if job else None
+
+    async def _run(self, job: BulkJob, match: dict, update: dict) -> None:
+        # Walk targets in _id order so every user is updated exactly once,
+        # even for non-idempotent updates like credit adjustments
+        last_id: Optional[PydanticObjectId] = None
+        status, error = BulkJobStatus.COMPLETED, None
+        try:
+            while True:
+                chunk_match = dict(match)
+                if last_id is not None:
+                    chunk_match["_id"] = {**chunk_match.get("_id", {}), "$gt": last_id}
+
+                rows = await User.aggregate([
+                    {"$match": chunk_match},
+                    {"$sort": {"_id": 1}},
+                    {"$limit": BULK_CHUNK_SIZE},
+                    {"$project": {"_id": 1}},
+                ]).to_list()
+                if not rows:
+                    break
+
+                ids: List[PydanticObjectId] = [row["_id"] for row in rows]
+                result = await User.find({"_id": {"$in": ids}}).update_many(update)
+
+                await job.update(
+                    Inc({BulkJob.processed: len(ids), BulkJob.modified: result.modified_count if result else 0}),
+                    Set({BulkJob.updated_at: datetime.utcnow()}),
+                )
+                last_id = ids[-1]
+                await invalidate_users(ids)
+
+                if len(ids) < BULK_CHUNK_SIZE:
+                    break
+
+        except Exception as e:
+            logger.error(f"Bulk action {job.id} ({job.action}) failed: {e}")
+            status, error = BulkJobStatus.FAILED, str(e)
+
+        now = datetime.utcnow()
+        await job.set({
+            BulkJob.status: status, BulkJob.error: error, BulkJob.updated_at: now, BulkJob.finished_at: now
+        })
+
+
+# Singleton instance
+bulk_action_service = BulkActionService()
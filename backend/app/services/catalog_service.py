@@ -0,0 +1,583 @@
+"""
+Catalog Service - Process-wide, immutable snapshot of consultant profiles
+"""
+import asyncio
+import bisect
+import heapq
+import logging
+from collections import Counter
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from beanie import PydanticObjectId
+
+from app.core.cache import CATALOG_TAG, on_users_changed, response_cache
+from app.core.config import settings
+from app.db.mongodb import secondary_aggregate
+from app.models.user import (
+    User, UserRole, AvailabilityStatus, ConsultantSort, CONSULTANT_SORT_FIELDS, normalize_search_text
+)
+from app.schemas.user import PublicUserResponse
+
+logger = logging.getLogger(__name__)
+
+# Fields copied into each snapshot record's response payload
+RESPONSE_FIELDS = [name for name in PublicUserResponse.model_fields if name != "id"]
+
+# Price per minute bands reported as facets: (value, lower bound, upper bound).
+# Bands are half-open, [lower, upper), like the min_price / max_price filters
+PRICE_BANDS = [("0-1", 0, 1), ("1-2", 1, 2), ("2-5", 2, 5), ("5+", 5, None)]
+UNPRICED_BAND = "unpriced"
+
+# Most common skills reported in the skills facet
+TOP_SKILLS_FACET = 20
+
+# Facets returned by discovery, each counted against every filter but its own
+FACETS = ["category", "skills", "price_band", "status"]
+
+# Skill suggestion results remembered per index (prefixes repeat a lot)
+SKILL_SUGGESTION_CACHE_SIZE = 1024
+
+# Snapshot attribute holding each sort field
+RECORD_ATTRIBUTES = {"price_per_minute": "price"}
+
+
+def price_band(price: Optional[float]) -> str:
+    if price is None:
+        return UNPRICED_BAND
+    for value, _, upper in PRICE_BANDS:
+        if upper is None or price < upper:
+            return value
+    return PRICE_BANDS[-1][0]
+
+
+def price_band_expression() -> dict:
+    """`price_band` as an aggregation expression over `$price_per_minute`"""
+    return {"$switch": {
+        "branches": [{"case": {"$eq": [{"$ifNull": ["$price_per_minute", None]}, None]}, "then": UNPRICED_BAND}] + [
+            {"case": {"$lt": ["$price_per_minute", upper]}, "then": value}
+            for value, _, upper in PRICE_BANDS if upper is not None
+        ],
+        "default": PRICE_BANDS[-1][0],
+    }}
+
+
+class ConsultantFilters:
+    """
+    Discovery filters, applied identically to MongoDB queries and to the
+    in-memory catalog. Each filter belongs to a facet so facet counts can
+    leave their own dimension out.
+    """
+
+    def __init__(
+        self,
+        category: Optional[str] = None,
+        skills: Optional[List[str]] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        available_now: bool = False,
+    ):
+        self.category = category
+        self.skills = frozenset(skills) if skills else None
+        self.min_price = min_price
+        self.max_price = max_price
+        self.available_now = available_now
+
+    def to_match(self, exclude: Optional[str] = None) -> dict:
+        match: Dict[str, Any] = {"role": UserRole.CONSULTANT.value}
+        if self.category and exclude != "category":
+            match["category"] = self.category
+        if self.skills and exclude != "skills":
+            match["skills"] = {"$all": sorted(self.skills)}
+        if (self.min_price is not None or self.max_price is not None) and exclude != "price_band":
+            match["price_per_minute"] = {
+                **({"$gte": self.min_price} if self.min_price is not None else {}),
+                **({"$lt": self.max_price} if self.max_price is not None else {}),
+            }
+        if self.available_now and exclude != "status":
+            # Together with role, this selects the small online_consultants partial index
+            match["status"] = AvailabilityStatus.ONLINE.value
+        return match
+
+    def failures(self, record: "ConsultantRecord") -> List[str]:
+        """Facets whose filter rejects `record` (empty when it matches)"""
+        failed = []
+        if self.category and record.category != self.category:
+            failed.append("category")
+        if self.skills and not self.skills <= record.skills:
+            failed.append("skills")
+        # Like the database filters, a price bound excludes unpriced profiles
+        if self.min_price is not None or self.max_price is not None:
+            if (
+                record.price is None
+                or (self.min_price is not None and record.price < self.min_price)
+                or (self.max_price is not None and record.price >= self.max_price)
+            ):
+                failed.append("price_band")
+        if self.available_now and record.status != AvailabilityStatus.ONLINE.value:
+            failed.append("status")
+        return failed
+
+
+def facet_pipelines(filters: ConsultantFilters) -> Dict[str, List[dict]]:
+    """`$facet` sub-pipelines counting each facet against the other filters"""
+    def count_by(facet: str, key: Any, *stages: dict) -> List[dict]:
+        return [
+            {"$match": filters.to_match(exclude=facet)},
+            *stages,
+            {"$group": {"_id": key, "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+        ]
+
+    return {
+        "category": count_by("category", "$category"),
+        "skills": count_by("skills", "$skills", {"$unwind": "$skills"}) + [{"$limit": TOP_SKILLS_FACET}],
+        "price_band": count_by("price_band", price_band_expression()),
+        "status": count_by("status", "$status"),
+    }
+
+
+def format_facets(counts: Dict[str, Iterable[Tuple[Any, int]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Shape raw (value, count) pairs for the response; price bands keep band order"""
+    facets = {}
+    for facet in FACETS:
+        pairs = [(value, count) for value, count in counts.get(facet, ()) if value not in (None, "") and count]
+        if facet == "price_band":
+            order = [value for value, _, _ in PRICE_BANDS] + [UNPRICED_BAND]
+            pairs.sort(key=lambda pair: order.index(pair[0]))
+        else:
+            pairs.sort(key=lambda pair: (-pair[1], pair[0]))
+            if facet == "skills":
+                pairs = pairs[:TOP_SKILLS_FACET]
+        facets[facet] = [{"value": value, "count": count} for value, count in pairs]
+
+    bounds = {value: (lower, upper) for value, lower, upper in PRICE_BANDS}
+    for entry in facets["price_band"]:
+        lower, upper = bounds.get(entry["value"], (None, None))
+        entry["min_price"], entry["max_price"] = lower, upper
+    return facets
+
+
+class ConsultantRecord:
+    """One consultant: the fields discovery filters on plus a ready response"""
+    __slots__ = (
+        "id", "category", "skills", "price", "rating", "bayesian_rating",
+        "review_count", "status", "created_at", "response",
+    )
+
+    def __init__(self, doc: dict):
+        self.id: str = str(doc["_id"])
+        self.category: str = doc.get("category") or ""
+        self.skills: FrozenSet[str] = frozenset(doc.get("skills") or ())
+        self.price: Optional[float] = doc.get("price_per_minute")
+        self.rating: float = doc.get("rating", 5.0)
+        self.bayesian_rating: Optional[float] = doc.get("bayesian_rating")
+        self.review_count: int = doc.get("review_count", 0)
+        self.status: str = doc.get("status", "offline")
+        self.created_at: Optional[datetime] = doc.get("created_at")
+        self.response: Dict[str, Any] = {"id": self.id, **{f: doc[f] for f in RESPONSE_FIELDS if f in doc}}
+
+
+class SkillIndex:
+    """
+    Immutable, sorted array of normalized skills with how many consultants
+    list each one, for prefix lookups by bisection. Each skill is shown in
+    its most common spelling.
+    """
+    __slots__ = ("spellings", "counts", "keys", "_suggestions")
+
+    def __init__(self, spellings: Dict[str, Counter], keys: Optional[List[str]] = None):
+        # normalized skill -> Counter of the spellings consultants used
+        self.spellings = spellings
+        self.counts: Dict[str, int] = {key: sum(c.values()) for key, c in spellings.items()}
+        self.keys: List[str] = keys if keys is not None else sorted(spellings)
+        self._suggestions: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def build(cls, records: Iterable["ConsultantRecord"]) -> "SkillIndex":
+        spellings: Dict[str, Counter] = {}
+        for record in records:
+            for skill in record.skills:
+                cls._add(spellings, skill, 1)
+        return cls(spellings)
+
+    def with_changes(self, removed: Iterable[str], added: Iterable[str]) -> "SkillIndex":
+        """A new index with some skill listings dropped and others added"""
+        spellings = dict(self.spellings)
+        keys = self.keys
+        copied = set()
+        for skill, delta in [(s, -1) for s in removed] + [(s, 1) for s in added]:
+            key = normalize_search_text(skill).strip()
+            if key and key not in copied:
+                # Copy-on-write: counters shared with the old index stay untouched
+                spellings[key] = Counter(spellings.get(key, ()))
+                copied.add(key)
+            self._add(spellings, skill, delta)
+
+        if any(key not in self.counts or not spellings.get(key) for key in copied):
+            keys = sorted(key for key, c in spellings.items() if c)
+        return SkillIndex({key: c for key, c in spellings.items() if c}, keys)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """The `limit` most listed skills starting with `prefix`"""
+        prefix = normalize_search_text(prefix).strip()
+        cache_key = (prefix, limit)
+        cached = self._suggestions.get(cache_key)
+        if cached is not None:
+            return cached
+
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + "\U0010ffff", start)
+        top = heapq.nsmallest(limit, self.keys[start:end], key=lambda key: (-self.counts[key], key))
+        suggestions = [
+            {"skill": self.spellings[key].most_common(1)[0][0], "count": self.counts[key]}
+            for key in top
+        ]
+        if len(self._suggestions) < SKILL_SUGGESTION_CACHE_SIZE:
+            self._suggestions[cache_key] = suggestions
+        return suggestions
+
+    @staticmethod
+    def _add(spellings: Dict[str, Counter], skill: str, delta: int) -> None:
+        key = normalize_search_text(skill).strip()
+        if not key:
+            return
+        counter = spellings.setdefault(key, Counter())
+        counter[skill.strip()] += delta
+        if counter[skill.strip()] <= 0:
+            del counter[skill.strip()]
+
+
+def order_key(sort: Optional[ConsultantSort], online_first: bool = False) -> Callable[["ConsultantRecord"], tuple]:
+    """
+    Total order of records under `sort`, as a key: missing values sort
+    lowest and ties break by id, like MongoDB with an _id tiebreaker.
+    """
+    online = AvailabilityStatus.ONLINE.value
+    if sort is None:
+        return lambda r: (online_first and r.status != online, r.id)
+
+    field, direction = CONSULTANT_SORT_FIELDS[sort]
+    attr = RECORD_ATTRIBUTES.get(field, field)
+
+    def key(record: "ConsultantRecord") -> tuple:
+        value = getattr(record, attr)
+        if isinstance(value, datetime):
+            value = value.timestamp()
+        if direction < 0:
+            # Descending: highest first, missing values last
+            return (online_first and record.status != online, value is None, -(value or 0), record.id)
+        return (online_first and record.status != online, value is not None, value or 0, record.id)
+
+    return key
+
+
+def _spliced(
+    records: Sequence["ConsultantRecord"],
+    removed: Iterable["ConsultantRecord"],
+    added: Iterable["ConsultantRecord"],
+    key: Callable[["ConsultantRecord"], Any],
+) -> Tuple["ConsultantRecord", ...]:
+    """`records` (ordered by `key`) with some records taken out and others put in place"""
+    spliced = list(records)
+    for record in removed:
+        i = bisect.bisect_left(spliced, key(record), key=key)
+        if i < len(spliced) and spliced[i] is record:
+            del spliced[i]
+    for record in added:
+        bisect.insort(spliced, record, key=key)
+    return tuple(spliced)
+
+
+_record_id = attrgetter("id")
+
+
+class CatalogSnapshot:
+    """Immutable, id-ordered tuple of consultant records, partitioned by category"""
+    __slots__ = ("records", "by_id", "by_category", "online", "skills", "built_at", "_orders")
+
+    def __init__(self, records: Iterable[ConsultantRecord], skills: Optional[SkillIndex] = None):
+        self.records: Tuple[ConsultantRecord, ...] = tuple(sorted(records, key=_record_id))
+        self.by_id: Dict[str, ConsultantRecord] = {r.id: r for r in self.records}
+        by_category: Dict[str, List[ConsultantRecord]] = {}
+        for record in self.records:
+            by_category.setdefault(record.category, []).append(record)
+        self.by_category: Dict[str, Tuple[ConsultantRecord, ...]] = {
+            category: tuple(records) for category, records in by_category.items()
+        }
+        self.online: Tuple[ConsultantRecord, ...] = tuple(
+            r for r in self.records if r.status == AvailabilityStatus.ONLINE.value
+        )
+        self.skills: SkillIndex = skills if skills is not None else SkillIndex.build(self.records)
+        self.built_at = datetime.utcnow()
+        self._orders: Dict[tuple, Tuple[ConsultantRecord, ...]] = {}
+
+    def with_changes(
+        self,
+        stale: List[ConsultantRecord],
+        fresh: List[ConsultantRecord],
+        skills: Optional[SkillIndex] = None
+    ) -> "CatalogSnapshot":
+        """
+        A new snapshot with `stale` records replaced by `fresh` ones. Only
+        the id order, the partitions and the cached orders the changed
+        records belong to are spliced (by bisection); the rest is shared.
+        """
+        online = AvailabilityStatus.ONLINE.value
+        snapshot = CatalogSnapshot.__new__(CatalogSnapshot)
+        snapshot.records = _spliced(self.records, stale, fresh, _record_id)
+        snapshot.by_id = dict(self.by_id)
+        for record in stale:
+            snapshot.by_id.pop(record.id, None)
+        snapshot.by_id.update((record.id, record) for record in fresh)
+
+        categories = {r.category for r in stale} | {r.category for r in fresh}
+        snapshot.by_category = dict(self.by_category)
+        for category in categories:
+            partition = _spliced(
+                self.by_category.get(category, ()),
+                [r for r in stale if r.category == category],
+                [r for r in fresh if r.category == category],
+                _record_id,
+            )
+            if partition:
+                snapshot.by_category[category] = partition
+            else:
+                snapshot.by_category.pop(category, None)
+
+        snapshot.online = _spliced(
+            self.online,
+            [r for r in stale if r.status == online],
+            [r for r in fresh if r.status == online],
+            _record_id,
+        )
+        snapshot.skills = skills if skills is not None else self.skills
+        snapshot.built_at = self.built_at
+
+        snapshot._orders = {}
+        for (sort, category, online_only, online_first), records in self._orders.items():
+            if category and category not in categories:
+                snapshot._orders[(sort, category, online_only, online_first)] = records
+                continue
+
+            def belongs(record: ConsultantRecord) -> bool:
+                return (not category or record.category == category) and (
+                    not online_only or record.status == online
+                )
+
+            snapshot._orders[(sort, category, online_only, online_first)] = _spliced(
+                records,
+                [r for r in stale if belongs(r)],
+                [r for r in fresh if belongs(r)],
+                order_key(sort, online_first and not online_only),
+            )
+        return snapshot
+
+    def ordered(
+        self,
+        sort: Optional[ConsultantSort] = None,
+        category: Optional[str] = None,
+        online_only: bool = False,
+        online_first: bool = False
+    ) -> Tuple[ConsultantRecord, ...]:
+        """
+        Records of `category` (or all) in `sort` order, optionally only or
+        first the online ones; computed once per snapshot. Mirrors MongoDB:
+        missing values sort lowest, ties by _id.
+        """
+        if sort is None and not online_only and not online_first:
+            return self.by_category.get(category, ()) if category else self.records
+
+        key = (sort, category, online_only, online_first)
+        if key not in self._orders:
+            if online_only:
+                records = [r for r in self.online if not category or r.category == category]
+            else:
+                records = self.by_category.get(category, ()) if category else self.records
+            self._orders[key] = tuple(sorted(records, key=order_key(sort, online_first and not online_only)))
+        return self._orders[key]
+
+
+class CatalogService:
+    """
+    Serves consultant discovery from memory. The snapshot is replaced
+    wholesale (never mutated), so readers need no locking: single changed
+    profiles are spliced in copy-on-write, and a periodic full rebuild picks
+    up writes made by other processes.
+
+    Loads overlap, so every load takes a generation number and each user
+    remembers the generation their published record was loaded at: a
+    rebuild or refresh never publishes over a newer refresh.
+    """
+
+    def __init__(self):
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._generation = 0
+        # user id -> generation of their published record, for records
+        # newer than the last full rebuild
+        self._loaded_at: Dict[str, int] = {}
+        self._full_generation = 0
+
+    def _next_generation(self) -> int:
+        self._generation += 1
+        return self._generation
+
+    @staticmethod
+    async def _load(match: dict, secondary: bool = False) -> List[ConsultantRecord]:
+        # created_at is only sorted on (newest), not returned
+        projection = {**{name: 1 for name in RESPONSE_FIELDS}, "created_at": 1}
+        pipeline = [{"$match": {**match, "role": UserRole.CONSULTANT.value}}, {"$project": projection}]
+        cursor = secondary_aggregate(User, pipeline) if secondary else User.aggregate(pipeline)
+        return [ConsultantRecord(doc) async for doc in cursor]
+
+    def _publish(self, snapshot: CatalogSnapshot) -> None:
+        self.snapshot = snapshot
+        response_cache.invalidate_tags([CATALOG_TAG])
+
+    async def refresh(self) -> None:
+        """Rebuild the whole snapshot from the database"""
+        generation = self._next_generation()
+        # Full rebuilds may lag slightly behind; single-profile refreshes
+        # follow writes, so they read from the primary
+        records = await self._load({}, secondary=True)
+        if generation < self._full_generation:
+            return  # A later rebuild has already been published
+
+        snapshot = CatalogSnapshot(records)
+        # Users refreshed while this rebuild was loading keep their newer record
+        newer = {user_id for user_id, loaded_at in self._loaded_at.items() if loaded_at > generation}
+        if newer and self.snapshot is not None:
+            snapshot = self._spliced(snapshot, newer, [self.snapshot.by_id[i] for i in newer if i in self.snapshot.by_id])
+
+        self._full_generation = generation
+        self._loaded_at = {user_id: self._loaded_at[user_id] for user_id in newer}
+        self._publish(snapshot)
+        logger.info(f"Consultant catalog loaded: {len(snapshot.records)} consultants")
+
+    async def refresh_users(self, user_ids: Iterable[Any]) -> None:
+        """Splice fresh records in for the given users (dropping non-consultants)"""
+        if self.snapshot is None:
+            # Listings come straight from the database meanwhile
+            response_cache.invalidate_tags([CATALOG_TAG])
+            return
+        generation = self._next_generation()
+        ids = {str(user_id) for user_id in user_ids}
+        fresh = await self._load({"_id": {"$in": [PydanticObjectId(i) for i in ids]}})
+
+        # Skip users whose record was published by a newer refresh meanwhile.
+        # A rebuild is not newer even if it started later: it may read from
+        # a secondary that has yet to see the write behind this refresh
+        ids = {i for i in ids if self._loaded_at.get(i, 0) < generation}
+        fresh = [r for r in fresh if r.id in ids]
+        snapshot = self.snapshot
+        if not ids or (not fresh and not any(i in snapshot.by_id for i in ids)):
+            return  # None of them are (or were) consultants
+
+        for user_id in ids:
+            self._loaded_at[user_id] = generation
+        self._publish(self._spliced(snapshot, ids, fresh))
+
+    @staticmethod
+    def _spliced(snapshot: CatalogSnapshot, ids: Set[str], fresh: List[ConsultantRecord]) -> CatalogSnapshot:
+        """`snapshot` with the records of `ids` replaced by `fresh`"""
+        stale = [snapshot.by_id[i] for i in ids if i in snapshot.by_id]
+        skills = snapshot.skills
+        if {r.id: r.skills for r in stale} != {r.id: r.skills for r in fresh}:
+            skills = skills.with_changes(
+                removed=[skill for r in stale for skill in r.skills],
+                added=[skill for r in fresh for skill in r.skills],
+            )
+        return snapshot.with_changes(stale, fresh, skills)
+
+    async def start(self) -> None:
+        """Load the snapshot and keep it fresh in the background"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Consultant catalog load failed, discovery will query MongoDB: {e}")
+        self._refresh_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.CATALOG_REFRESH_SECONDS)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Consultant catalog refresh failed: {e}")
+
+    def query(
+        self,
+        filters: ConsultantFilters,
+        sort: Optional[ConsultantSort] = None,
+        online_first: bool = False,
+        skip: int = 0,
+        limit: int = 10
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Filter the snapshot in memory. Returns None while no snapshot is
+        loaded, so callers can fall back to the database.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+
+        matches = []
+        for record in snapshot.ordered(sort, filters.category, filters.available_now, online_first):
+            if filters.failures(record):
+                continue
+            matches.append(record)
+            if len(matches) >= skip + limit:
+                break
+
+        return [record.response for record in matches[skip:skip + limit]]
+
+    def facets(self, filters: ConsultantFilters) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Facet counts over the snapshot in a single pass: a record counts
+        towards a facet when every filter except that facet's own accepts it.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+
+        counts: Dict[str, Counter] = {facet: Counter() for facet in FACETS}
+        for record in snapshot.records:
+            failed = filters.failures(record)
+            if len(failed) > 1:
+                continue
+            for facet in FACETS:
+                if failed and failed[0] != facet:
+                    continue
+                if facet == "skills":
+                    counts[facet].update(record.skills)
+                elif facet == "category":
+                    counts[facet][record.category] += 1
+                elif facet == "price_band":
+                    counts[facet][price_band(record.price)] += 1
+                else:
+                    counts[facet][record.status] += 1
+
+        return format_facets({facet: counter.items() for facet, counter in counts.items()})
+
+    def suggest_skills(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Skill autocomplete from memory; empty until the catalog is loaded"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return []
+        return snapshot.skills.suggest(prefix, limit)
+
+
+# Singleton instance
+catalog_service = CatalogService()
+
+
+@on_users_changed
+async def _refresh_changed_consultants(user_ids: List[str]) -> None:
+    await catalog_service.refresh_users(user_ids)
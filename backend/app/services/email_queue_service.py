@@ -0,0 +1,202 @@
+"""
+Email Queue Service - Durable, retried delivery of notification emails
+"""
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
+
+from beanie import UpdateResponse
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.models.email_job import EmailJob, EmailJobStatus
+from app.models.user import NotificationDelivery, User
+from app.services.email_service import DIGEST_ITEMS, email_service
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed job is reserved for its worker before others may retry it
+LEASE_SECONDS = 120
+
+# Notification kinds and the EmailService method that sends each one
+NOTIFICATIONS = {
+    "session_request": email_service.send_session_request_notification,
+    "session_accepted": email_service.send_session_accepted_notification,
+    "session_rejected": email_service.send_session_rejected_notification,
+    "session_reminder": email_service.send_session_reminder,
+    "session_completed": email_service.send_session_completed_notification,
+}
+
+
+class EmailQueueService:
+    """
+    Persists notification emails in MongoDB and delivers them from worker
+    processes (see email_worker.py), so API requests never wait on SMTP and
+    nothing is lost when a process restarts.
+    """
+
+    @staticmethod
+    async def enqueue(
+        kind: str,
+        idempotency_key: str,
+        recipient: Optional[User] = None,
+        **params: Any
+    ) -> bool:
+        """
+        Queue a notification; returns False if `idempotency_key` was already
+        queued. If `recipient` prefers digests and `kind` can be batched, the
+        email waits out the digest window and goes out with their others.
+        """
+        if kind not in NOTIFICATIONS:
+            raise ValueError(f"Unknown notification: {kind}")
+        job = EmailJob(kind=kind, idempotency_key=idempotency_key, params=params)
+        if (
+            recipient is not None
+            and kind in DIGEST_ITEMS
+            and recipient.notification_delivery == NotificationDelivery.DIGEST
+        ):
+            job.digest_for = recipient.id
+            job.run_after = job.created_at + timedelta(seconds=settings.EMAIL_DIGEST_WINDOW_SECONDS)
+        try:
+            await job.insert()
+        except DuplicateKeyError:
+            logger.info(f"Email {idempotency_key} already queued")
+            return False
+        return True
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Exponential backoff with jitter, capped"""
+        delay = min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.EMAIL_RETRY_MAX_SECONDS)
+        return delay * random.uniform(0.8, 1.2)
+
+    @staticmethod
+    async def claim() -> Optional[EmailJob]:
+        """Lease the oldest due job (or one whose worker's lease ran out)"""
+        now = datetime.utcnow()
+        return await EmailJob.find_one({"$or": [
+            {"status": EmailJobStatus.PENDING.value, "run_after": {"$lte": now}},
+            {"status": EmailJobStatus.SENDING.value, "locked_until": {"$lt": now}},
+        ]}).update(
+            {
+                "$set": {
+                    "status": EmailJobStatus.SENDING.value,
+                    "locked_until": now + timedelta(seconds=LEASE_SECONDS),
+                },
+                "$inc": {"attempts": 1},
+            },
+            response_type=UpdateResponse.NEW_DOCUMENT,
+            sort=[("run_after", 1)],
+        )
+
+    async def process(self, job: EmailJob) -> None:
+        """Send one claimed job (with the rest of its digest) and record the outcome"""
+        if not email_service.is_configured:
+            await self._finish(job, EmailJobStatus.SKIPPED, error="Email not configured")
+            return
+
+        batch = [job]
+        if job.digest_for is not None:
+            batch += await self._claim_digest(job)
+
+        try:
+            if len(batch) == 1:
+                sent = await NOTIFICATIONS[job.kind](**job.params)
+            else:
+                recipient = await User.get(job.digest_for)
+                if recipient is None:
+                    for item in batch:
+                        await self._finish(item, EmailJobStatus.SKIPPED, error="Recipient not found")
+                    return
+                sent = await email_service.send_digest_notification(
+                    recipient.email,
+                    recipient.first_name,
+                    [(item.kind, item.params) for item in batch]
+                )
+                if sent:
+                    logger.info(f"Sent {len(batch)} notifications to {recipient.email} as one digest")
+            error = None if sent else "SMTP delivery failed"
+        except Exception as e:
+            sent, error = False, f"{type(e).__name__}: {e}"
+
+        for item in batch:
+            await self._record(item, sent, error)
+
+    async def _record(self, job: EmailJob, sent: bool, error: Optional[str]) -> None:
+        if sent:
+            await self._finish(job, EmailJobStatus.SENT)
+        elif job.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            logger.error(f"Email {job.idempotency_key} dead-lettered after {job.attempts} attempts: {error}")
+            await self._finish(job, EmailJobStatus.DEAD, error=error)
+        else:
+            delay = self.retry_delay(job.attempts)
+            logger.warning(f"Email {job.idempotency_key} failed (attempt {job.attempts}), retrying in {delay:.0f}s")
+            await EmailJob.find_one(EmailJob.id == job.id).update({"$set": {
+                "status": EmailJobStatus.PENDING.value,
+                "run_after": datetime.utcnow() + timedelta(seconds=delay),
+                "locked_until": None,
+                "last_error": error,
+            }})
+
+    @staticmethod
+    async def _claim_digest(job: EmailJob) -> List[EmailJob]:
+        """Lease the recipient's other pending digest items, due or not, oldest first"""
+        items = []
+        while len(items) + 1 < settings.EMAIL_DIGEST_MAX_ITEMS:
+            item = await EmailJob.find_one({
+                "digest_for": job.digest_for,
+                "status": EmailJobStatus.PENDING.value,
+            }).update(
+                {
+                    "$set": {"status": EmailJobStatus.SENDING.value, "locked_until": job.locked_until},
+                    "$inc": {"attempts": 1},
+                },
+                response_type=UpdateResponse.NEW_DOCUMENT,
+                sort=[("created_at", 1)],
+            )
+            if item is None:
+                break
+            items.append(item)
+        return items
+
+    async def run_worker(self, stop: asyncio.Event, concurrency: int = 4) -> None:
+        """Claim and send jobs until `stop` is set, `concurrency` at a time"""
+        async def loop() -> None:
+            while not stop.is_set():
+                try:
+                    job = await self.claim()
+                    if job is None:
+                        try:
+                            await asyncio.wait_for(stop.wait(), settings.EMAIL_QUEUE_POLL_SECONDS)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    await self.process(job)
+                except Exception as e:
+                    logger.error(f"Email worker error: {e}")
+                    await asyncio.sleep(settings.EMAIL_QUEUE_POLL_SECONDS)
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+
+    @staticmethod
+    async def requeue_dead() -> int:
+        """Give every dead-lettered job a fresh set of attempts"""
+        result = await EmailJob.find(EmailJob.status == EmailJobStatus.DEAD).update_many({"$set": {
+            "status": EmailJobStatus.PENDING.value,
+            "attempts": 0,
+            "run_after": datetime.utcnow(),
+        }})
+        return result.modified_count if result else 0
+
+    @staticmethod
+    async def _finish(job: EmailJob, status: EmailJobStatus, error: Optional[str] = None) -> None:
+        update = {"status": status.value, "locked_until": None, "last_error": error}
+        if status == EmailJobStatus.SENT:
+            update["sent_at"] = datetime.utcnow()
+        await EmailJob.find_one(EmailJob.id == job.id).update({"$set": update})
+
+
+# Singleton instance
+email_queue_service = EmailQueueService()
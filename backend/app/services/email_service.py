@@ -1,13 +1,19 @@
 """
 Email Service - Handles email notifications
 """
+import asyncio
 import logging
-from typing import Optional, List
+import re
+import secrets
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional, List, Set, Tuple
 from pathlib import Path
 import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 
 from app.core.config import settings
 
@@ -16,6 +22,230 @@ logger = logging.getLogger(__name__)
 # Email templates directory
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates" / "email"
 
+# Template whose <style> block is inlined into every email
+STYLESHEET_TEMPLATE = "base.html"
+
+CSS_RULE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+# Only `tag` and `.class` selectors are inlined; the rest (:hover, descendant
+# selectors) stay in <style> for clients that support it
+INLINE_SELECTOR = re.compile(r"^(?:[a-z][a-z0-9]*|\.[\w-]+)$")
+STRUCTURAL_SELECTOR = re.compile(r"^([a-z][a-z0-9]*|\.[\w-]+):(?:first|last|nth)-")
+OPEN_TAG = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)\b([^<>]*)>")
+CLASS_ATTR = re.compile(r'\sclass="([^"{}]*)"')
+STYLE_ATTR = re.compile(r'\sstyle="([^"]*)"')
+STYLE_BLOCK = re.compile(r"<style\b[^>]*>(.*?)</style>", re.S)
+HEAD_END = "</head>"
+
+
+def parse_stylesheet(css: str) -> Dict[str, str]:
+    """Map each inlinable selector to its declarations"""
+    rules: Dict[str, List[Tuple[str, str]]] = {}
+    # Properties that structural rules like `.row:last-child` override must
+    # stay in <style> only, or the inlined value would always win
+    structural: Dict[str, Set[str]] = {}
+    for selectors, body in CSS_RULE.findall(css):
+        declarations = [
+            (name.strip().lower(), value.strip())
+            for name, _, value in (d.partition(":") for d in body.split(";") if d.strip())
+        ]
+        for selector in selectors.split(","):
+            selector = selector.strip()
+            if INLINE_SELECTOR.match(selector):
+                rules.setdefault(selector, []).extend(declarations)
+            elif (structure := STRUCTURAL_SELECTOR.match(selector)):
+                structural.setdefault(structure.group(1), set()).update(name for name, _ in declarations)
+
+    return {
+        selector: "; ".join(
+            f"{name}: {value}" for name, value in declarations
+            if name not in structural.get(selector, ())
+        )
+        for selector, declarations in rules.items()
+    }
+
+
+def inline_css(html: str, rules: Dict[str, str]) -> str:
+    """
+    Copy matching rules into each tag's style attribute (tag rules, then
+    class rules, then the tag's own style). Works on template source, since
+    Jinja tags never look like HTML tags.
+    """
+    def inline(match: re.Match) -> str:
+        tag, attrs = match.group(1), match.group(2)
+        declarations = [rules[tag.lower()]] if rules.get(tag.lower()) else []
+        classes = CLASS_ATTR.search(attrs)
+        if classes:
+            declarations += [rules[f".{c}"] for c in classes.group(1).split() if rules.get(f".{c}")]
+        if not declarations:
+            return match.group(0)
+
+        style = STYLE_ATTR.search(attrs)
+        if style:
+            declarations.append(style.group(1).strip().rstrip(";"))
+            attrs = attrs[:style.start()] + attrs[style.end():]
+        attrs = attrs.rstrip()
+        closing = "/" if attrs.endswith("/") else ""
+        attrs = attrs[:-1].rstrip() if closing else attrs
+        return f'<{tag}{attrs} style="{"; ".join(declarations)}"{closing}>'
+
+    # Leave <head> (and its <style> block) alone
+    head_end = html.find(HEAD_END)
+    head_end = 0 if head_end < 0 else head_end + len(HEAD_END)
+    return html[:head_end] + OPEN_TAG.sub(inline, html[head_end:])
+
+
+def format_email_time(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime("%b %d, %Y at %H:%M UTC") if value else None
+
+
+def format_amount(value: Optional[float]) -> Optional[str]:
+    return f"{value:.2f}" if value is not None else None
+
+
+class InlineCSSLoader(FileSystemLoader):
+    """
+    Loads templates with the shared stylesheet already inlined, so inlining
+    costs nothing per email: Jinja compiles the inlined source once.
+    """
+
+    def __init__(self, searchpath: str, stylesheet_template: str):
+        super().__init__(searchpath)
+        source = (Path(searchpath) / stylesheet_template).read_text(encoding="utf-8")
+        self.rules = parse_stylesheet("\n".join(STYLE_BLOCK.findall(source)))
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        return inline_css(source, self.rules), filename, uptodate
+
+
+# Idle connections older than this get a NOOP before reuse
+HEALTH_CHECK_AFTER_SECONDS = 5.0
+
+# Errors meaning a pooled connection went away (worth one retry on a new one)
+CONNECTION_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError, ConnectionError)
+
+
+class _PooledConnection:
+    __slots__ = ("smtp", "sent", "last_used")
+
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    A few long-lived, authenticated SMTP connections shared by all sends.
+
+    Connections are opened lazily (up to `size` at once), checked with NOOP
+    when they've been idle for a while, retired after `max_messages`
+    messages or `idle_timeout` seconds unused, and replaced when the server
+    drops them.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        size: int = 3,
+        max_messages: int = 100,
+        idle_timeout: float = 60.0,
+        timeout: float = 30.0
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(size)
+        # Most recently used last, so busy periods keep reusing warm connections
+        self._idle: Deque[_PooledConnection] = deque()
+
+    async def send(self, message) -> None:
+        """Send `message`, retrying once on a fresh connection if a reused one was dead"""
+        async with self._slots:
+            conn = await self._acquire()
+            reused = conn.sent > 0
+            try:
+                await conn.smtp.send_message(message)
+            except CONNECTION_ERRORS:
+                await self._close(conn)
+                if not reused:
+                    raise
+                conn = await self._connect()
+                try:
+                    await conn.smtp.send_message(message)
+                except Exception:
+                    await self._close(conn)
+                    raise
+            except Exception:
+                # The connection may be mid-transaction; don't hand it out again
+                await self._close(conn)
+                raise
+            conn.sent += 1
+            await self._release(conn)
+
+    async def close(self) -> None:
+        """Politely close every idle connection"""
+        while self._idle:
+            await self._close(self._idle.pop(), quit=True)
+
+    async def _acquire(self) -> _PooledConnection:
+        while self._idle:
+            conn = self._idle.pop()
+            idle_for = time.monotonic() - conn.last_used
+            if idle_for > self.idle_timeout or not conn.smtp.is_connected:
+                await self._close(conn, quit=True)
+                continue
+            if idle_for > HEALTH_CHECK_AFTER_SECONDS:
+                try:
+                    await conn.smtp.noop()
+                except Exception:
+                    await self._close(conn)
+                    continue
+            return conn
+        return await self._connect()
+
+    async def _release(self, conn: _PooledConnection) -> None:
+        if conn.sent >= self.max_messages:
+            await self._close(conn, quit=True)
+            return
+        conn.last_used = time.monotonic()
+        self._idle.append(conn)
+
+    async def _connect(self) -> _PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            start_tls=self.start_tls,
+            timeout=self.timeout
+        )
+        await smtp.connect()
+        if self.username and self.password:
+            try:
+                await smtp.login(self.username, self.password)
+            except Exception:
+                smtp.close()
+                raise
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    async def _close(conn: _PooledConnection, quit: bool = False) -> None:
+        try:
+            if quit and conn.smtp.is_connected:
+                await conn.smtp.quit()
+        except Exception:
+            pass
+        finally:
+            conn.smtp.close()
+
 
 class EmailService:
     """Service for sending email notifications"""
@@ -28,12 +258,32 @@ class EmailService:
         self.from_email = settings.EMAILS_FROM_EMAIL
         self.from_name = settings.EMAILS_FROM_NAME
         
-        # Setup Jinja2 for email templates
+        # Reused SMTP connections, so each email skips connect, STARTTLS and AUTH
+        self.pool = SMTPConnectionPool(
+            hostname=self.smtp_host,
+            port=self.smtp_port,
+            username=self.smtp_user,
+            password=self.smtp_password,
+            start_tls=settings.SMTP_START_TLS,
+            size=settings.SMTP_POOL_SIZE,
+            max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            idle_timeout=settings.SMTP_IDLE_TIMEOUT_SECONDS
+        )
+        
+        self.from_header = f"{self.from_name} <{self.from_email}>"
+        
+        # Compile every template once, with the stylesheet already inlined
+        self.templates: Dict[str, Template] = {}
         if TEMPLATES_DIR.exists():
             self.jinja_env = Environment(
-                loader=FileSystemLoader(str(TEMPLATES_DIR)),
-                autoescape=select_autoescape(['html', 'xml'])
+                loader=InlineCSSLoader(str(TEMPLATES_DIR), STYLESHEET_TEMPLATE),
+                autoescape=select_autoescape(['html', 'xml']),
+                auto_reload=False
             )
+            self.jinja_env.globals["app_url"] = settings.FRONTEND_URL
+            for name in self.jinja_env.list_templates(extensions=["html"]):
+                if name != STYLESHEET_TEMPLATE:
+                    self.templates[name[:-len(".html")]] = self.jinja_env.get_template(name)
         else:
             self.jinja_env = None
             logger.warning(f"Email templates directory not found: {TEMPLATES_DIR}")
@@ -50,50 +300,56 @@ class EmailService:
         html_content: str,
         text_content: Optional[str] = None
     ) -> bool:
-        """Send an email"""
+        """
+        Send an email; False if email isn't configured. Delivery errors are
+        raised, so the queue can record the cause and retry.
+        """
         if not self.is_configured:
             logger.warning("Email not configured. Skipping send.")
             return False
         
         try:
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"{self.from_name} <{self.from_email}>"
-            message["To"] = to_email
-            
-            # Add plain text version
-            if text_content:
-                message.attach(MIMEText(text_content, "plain"))
-            
-            # Add HTML version
-            message.attach(MIMEText(html_content, "html"))
-            
-            # Send email
-            await aiosmtplib.send(
-                message,
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                username=self.smtp_user,
-                password=self.smtp_password,
-                start_tls=True
-            )
-            
-            logger.info(f"Email sent successfully to {to_email}")
-            return True
-            
+            await self.pool.send(self.build_message(to_email, subject, html_content, text_content))
         except Exception as e:
             logger.error(f"Failed to send email to {to_email}: {e}")
-            return False
+            raise
+        logger.info(f"Email sent successfully to {to_email}")
+        return True
+    
+    def build_message(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> MIMEMultipart:
+        """Assemble the MIME message for one email"""
+        # Parts are base64, which never contains "=_", so the boundary can't
+        # collide and the generator skips scanning the body for one
+        message = MIMEMultipart("alternative", boundary=f"=_{secrets.token_hex(16)}")
+        message["Subject"] = subject
+        message["From"] = self.from_header
+        message["To"] = to_email
+        
+        # Plain text first: clients show the last alternative they support
+        if text_content:
+            message.attach(MIMEText(text_content, "plain", "utf-8"))
+        message.attach(MIMEText(html_content, "html", "utf-8"))
+        return message
+    
+    async def close(self) -> None:
+        """Close pooled SMTP connections (on shutdown)"""
+        await self.pool.close()
     
     def _render_template(self, template_name: str, **context) -> str:
         """Render an email template"""
-        if not self.jinja_env:
+        template = self.templates.get(template_name)
+        if template is None:
             # Fallback to basic HTML
             return self._get_fallback_html(template_name, **context)
         
         try:
-            template = self.jinja_env.get_template(f"{template_name}.html")
-            return template.render(**context)
+            return template.render(year=datetime.utcnow().year, **context)
         except Exception as e:
             logger.error(f"Template rendering failed: {e}")
             return self._get_fallback_html(template_name, **context)
@@ -121,55 +377,23 @@ class EmailService:
         consultant_name: str,
         client_name: str,
         topic: str,
-        session_id: str
+        session_id: str,
+        scheduled_at: Optional[datetime] = None,
+        rate_per_minute: Optional[float] = None,
+        message: Optional[str] = None
     ) -> bool:
         """Notify consultant about new session request"""
         subject = f"New Session Request: {topic}"
-        
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #3b82f6, #8b5cf6); color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ padding: 30px; background: #ffffff; border: 1px solid #e5e7eb; }}
-                .highlight {{ background: #eff6ff; padding: 15px; border-radius: 8px; margin: 20px 0; }}
-                .button {{ display: inline-block; background: #3b82f6; color: white; padding: 14px 28px; 
-                          text-decoration: none; border-radius: 8px; font-weight: bold; }}
-                .footer {{ text-align: center; padding: 20px; color: #6b7280; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🎯 New Session Request</h1>
-                </div>
-                <div class="content">
-                    <p>Hi {consultant_name},</p>
-                    <p>Great news! You have a new consultation request.</p>
-                    
-                    <div class="highlight">
-                        <strong>Client:</strong> {client_name}<br>
-                        <strong>Topic:</strong> {topic}
-                    </div>
-                    
-                    <p>Log in to your dashboard to accept or decline this request.</p>
-                    
-                    <p style="text-align: center; margin: 30px 0;">
-                        <a href="http://localhost:5173/my-sessions" class="button">View Request</a>
-                    </p>
-                    
-                    <p>Best,<br>The MicroConsult Team</p>
-                </div>
-                <div class="footer">
-                    <p>© 2026 MicroConsult. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
+        html_content = self._render_template(
+            "session_request",
+            subject=subject,
+            consultant_name=consultant_name,
+            client_name=client_name,
+            session_topic=topic,
+            scheduled_time=format_email_time(scheduled_at),
+            rate_per_minute=format_amount(rate_per_minute),
+            message=message
+        )
         return await self.send_email(consultant_email, subject, html_content)
     
     async def send_session_accepted_notification(
@@ -178,55 +402,22 @@ class EmailService:
         client_name: str,
         consultant_name: str,
         topic: str,
-        session_id: str
+        session_id: str,
+        scheduled_at: Optional[datetime] = None,
+        rate_per_minute: Optional[float] = None
     ) -> bool:
         """Notify client that session was accepted"""
         subject = f"Session Accepted: {topic}"
-        
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #10b981, #3b82f6); color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ padding: 30px; background: #ffffff; border: 1px solid #e5e7eb; }}
-                .highlight {{ background: #ecfdf5; padding: 15px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #10b981; }}
-                .button {{ display: inline-block; background: #10b981; color: white; padding: 14px 28px; 
-                          text-decoration: none; border-radius: 8px; font-weight: bold; }}
-                .footer {{ text-align: center; padding: 20px; color: #6b7280; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>✅ Session Accepted!</h1>
-                </div>
-                <div class="content">
-                    <p>Hi {client_name},</p>
-                    <p>Great news! Your consultation request has been accepted.</p>
-                    
-                    <div class="highlight">
-                        <strong>Consultant:</strong> {consultant_name}<br>
-                        <strong>Topic:</strong> {topic}
-                    </div>
-                    
-                    <p>You can now join the session room to start your consultation.</p>
-                    
-                    <p style="text-align: center; margin: 30px 0;">
-                        <a href="http://localhost:5173/session/{session_id}" class="button">Join Session</a>
-                    </p>
-                    
-                    <p>Best,<br>The MicroConsult Team</p>
-                </div>
-                <div class="footer">
-                    <p>© 2026 MicroConsult. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
+        html_content = self._render_template(
+            "session_accepted",
+            subject=subject,
+            client_name=client_name,
+            consultant_name=consultant_name,
+            session_topic=topic,
+            session_url=f"{settings.FRONTEND_URL}/session/{session_id}",
+            scheduled_time=format_email_time(scheduled_at),
+            rate_per_minute=format_amount(rate_per_minute)
+        )
         return await self.send_email(client_email, subject, html_content)
     
     async def send_session_rejected_notification(
@@ -238,44 +429,13 @@ class EmailService:
     ) -> bool:
         """Notify client that session was rejected"""
         subject = f"Session Update: {topic}"
-        
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: #6b7280; color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ padding: 30px; background: #ffffff; border: 1px solid #e5e7eb; }}
-                .button {{ display: inline-block; background: #3b82f6; color: white; padding: 14px 28px; 
-                          text-decoration: none; border-radius: 8px; font-weight: bold; }}
-                .footer {{ text-align: center; padding: 20px; color: #6b7280; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Session Update</h1>
-                </div>
-                <div class="content">
-                    <p>Hi {client_name},</p>
-                    <p>Unfortunately, {consultant_name} is unable to accept your session request at this time.</p>
-                    <p>Don't worry - there are many other great consultants available!</p>
-                    
-                    <p style="text-align: center; margin: 30px 0;">
-                        <a href="http://localhost:5173/consultants" class="button">Find Another Expert</a>
-                    </p>
-                    
-                    <p>Best,<br>The MicroConsult Team</p>
-                </div>
-                <div class="footer">
-                    <p>© 2026 MicroConsult. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
+        html_content = self._render_template(
+            "session_rejected",
+            subject=subject,
+            client_name=client_name,
+            consultant_name=consultant_name,
+            session_topic=topic
+        )
         return await self.send_email(client_email, subject, html_content)
     
     async def send_session_reminder(
@@ -285,54 +445,23 @@ class EmailService:
         other_party_name: str,
         topic: str,
         scheduled_time: str,
-        session_id: str
+        session_id: str,
+        is_consultant: bool = False,
+        minutes_until: Optional[int] = None
     ) -> bool:
         """Send reminder for scheduled session"""
         subject = f"Reminder: Upcoming Session - {topic}"
-        
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #f59e0b, #ef4444); color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ padding: 30px; background: #ffffff; border: 1px solid #e5e7eb; }}
-                .highlight {{ background: #fef3c7; padding: 15px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #f59e0b; }}
-                .button {{ display: inline-block; background: #f59e0b; color: white; padding: 14px 28px; 
-                          text-decoration: none; border-radius: 8px; font-weight: bold; }}
-                .footer {{ text-align: center; padding: 20px; color: #6b7280; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>⏰ Session Reminder</h1>
-                </div>
-                <div class="content">
-                    <p>Hi {name},</p>
-                    <p>This is a reminder about your upcoming consultation.</p>
-                    
-                    <div class="highlight">
-                        <strong>With:</strong> {other_party_name}<br>
-                        <strong>Topic:</strong> {topic}<br>
-                        <strong>Scheduled:</strong> {scheduled_time}
-                    </div>
-                    
-                    <p style="text-align: center; margin: 30px 0;">
-                        <a href="http://localhost:5173/session/{session_id}" class="button">Join Session</a>
-                    </p>
-                    
-                    <p>Best,<br>The MicroConsult Team</p>
-                </div>
-                <div class="footer">
-                    <p>© 2026 MicroConsult. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
+        html_content = self._render_template(
+            "session_reminder",
+            subject=subject,
+            user_name=name,
+            other_party_name=other_party_name,
+            session_topic=topic,
+            scheduled_time=scheduled_time,
+            time_until=minutes_until,
+            is_consultant=is_consultant,
+            session_url=f"{settings.FRONTEND_URL}/session/{session_id}"
+        )
         return await self.send_email(email, subject, html_content)
     
     async def send_session_completed_notification(
@@ -348,62 +477,58 @@ class EmailService:
     ) -> bool:
         """Notify about completed session"""
         subject = f"Session Completed: {topic}"
-        
-        cost_text = f"Total Cost: ${total_cost:.2f}" if is_client else f"Earnings: ${total_cost:.2f}"
-        
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #10b981, #059669); color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ padding: 30px; background: #ffffff; border: 1px solid #e5e7eb; }}
-                .stats {{ display: flex; justify-content: space-around; margin: 20px 0; }}
-                .stat {{ text-align: center; padding: 15px; }}
-                .stat-value {{ font-size: 24px; font-weight: bold; color: #10b981; }}
-                .button {{ display: inline-block; background: #3b82f6; color: white; padding: 14px 28px; 
-                          text-decoration: none; border-radius: 8px; font-weight: bold; }}
-                .footer {{ text-align: center; padding: 20px; color: #6b7280; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🎉 Session Completed!</h1>
-                </div>
-                <div class="content">
-                    <p>Hi {name},</p>
-                    <p>Your consultation session has been completed successfully.</p>
-                    
-                    <div style="background: #f9fafb; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                        <p><strong>With:</strong> {other_party_name}</p>
-                        <p><strong>Topic:</strong> {topic}</p>
-                        <p><strong>Duration:</strong> {duration_minutes} minutes</p>
-                        <p><strong>{cost_text}</strong></p>
-                    </div>
-                    
-                    {"<p>We'd love to hear your feedback! Please take a moment to leave a review.</p>" if is_client else ""}
-                    
-                    <p style="text-align: center; margin: 30px 0;">
-                        <a href="http://localhost:5173/my-sessions" class="button">
-                            {"Leave a Review" if is_client else "View Dashboard"}
-                        </a>
-                    </p>
-                    
-                    <p>Thank you for using MicroConsult!</p>
-                    <p>Best,<br>The MicroConsult Team</p>
-                </div>
-                <div class="footer">
-                    <p>© 2026 MicroConsult. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
+        html_content = self._render_template(
+            "session_completed",
+            subject=subject,
+            user_name=name,
+            other_party_name=other_party_name,
+            session_topic=topic,
+            duration_minutes=duration_minutes,
+            total_cost=format_amount(total_cost),
+            is_consultant=not is_client
+        )
+        return await self.send_email(email, subject, html_content)
+    
+    async def send_digest_notification(
+        self,
+        email: str,
+        name: str,
+        notifications: List[Tuple[str, Dict[str, Any]]]
+    ) -> bool:
+        """Send several queued notifications (kind, params) as one email"""
+        items = [DIGEST_ITEMS[kind](params) for kind, params in notifications]
+        if all(kind == "session_request" for kind, _ in notifications):
+            subject = f"{len(items)} New Session Requests"
+        else:
+            subject = f"{len(items)} Session Updates"
+        html_content = self._render_template(
+            "session_digest",
+            subject=subject,
+            user_name=name,
+            items=items
+        )
         return await self.send_email(email, subject, html_content)
 
 
+# One digest entry per notification kind that can be batched
+DIGEST_ITEMS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "session_request": lambda p: {
+        "title": f"New request from {p['client_name']}",
+        "topic": p["topic"],
+        "scheduled_time": format_email_time(p.get("scheduled_at")),
+        "message": p.get("message"),
+    },
+    "session_accepted": lambda p: {
+        "title": f"{p['consultant_name']} accepted your request",
+        "topic": p["topic"],
+        "scheduled_time": format_email_time(p.get("scheduled_at")),
+    },
+    "session_rejected": lambda p: {
+        "title": f"{p['consultant_name']} couldn't take your request",
+        "topic": p["topic"],
+    },
+}
+
+
 # Singleton instance
 email_service = EmailService()
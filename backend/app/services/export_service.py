@@ -0,0 +1,235 @@
+"""
+Export Service - Constant-memory CSV / NDJSON exports for admins
+"""
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import DBRef, ObjectId
+from starlette.requests import Request
+
+from app.db.mongodb import secondary_aggregate
+from app.models.user import User
+from app.models.session import Session
+from app.models.review import Review
+from app.models.message import Message
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per cursor batch, name lookup and response chunk
+EXPORT_BATCH_SIZE = 1000
+
+# Upper bound on remembered user names, so memory stays flat on huge exports
+NAME_CACHE_SIZE = 10000
+
+
+class ExportDataset(str, Enum):
+    USERS = "users"
+    SESSIONS = "sessions"
+    REVIEWS = "reviews"
+    MESSAGES = "messages"
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    model: Any
+    date_field: str
+    columns: List[str]
+    # Link fields to resolve into "<name>_id" / "<name>_name" columns
+    user_refs: List[str] = field(default_factory=list)
+    # Other link fields, exported as "<name>_id"
+    refs: List[str] = field(default_factory=list)
+
+
+EXPORT_SPECS: Dict[ExportDataset, ExportSpec] = {
+    ExportDataset.USERS: ExportSpec(
+        model=User,
+        date_field="created_at",
+        columns=[
+            "id", "email", "first_name", "last_name", "role", "status", "is_active",
+            "credits", "rating", "review_count", "category", "price_per_minute", "created_at",
+        ],
+    ),
+    ExportDataset.SESSIONS: ExportSpec(
+        model=Session,
+        date_field="created_at",
+        columns=[
+            "id", "client_id", "client_name", "consultant_id", "consultant_name", "topic",
+            "status", "created_at", "scheduled_at", "actual_duration_seconds", "total_cost", "is_paid",
+        ],
+        user_refs=["client", "consultant"],
+    ),
+    ExportDataset.REVIEWS: ExportSpec(
+        model=Review,
+        date_field="created_at",
+        columns=[
+            "id", "session_id", "client_id", "client_name", "consultant_id", "consultant_name",
+            "rating", "comment", "created_at",
+        ],
+        user_refs=["client", "consultant"],
+        refs=["session"],
+    ),
+    ExportDataset.MESSAGES: ExportSpec(
+        model=Message,
+        date_field="timestamp",
+        columns=["id", "session_id", "sender_id", "sender_name", "content", "timestamp"],
+        user_refs=["sender"],
+        refs=["session"],
+    ),
+}
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+    """Streams whole collections straight from a database cursor"""
+
+    def media_type(self, fmt: ExportFormat) -> str:
+        return "text/csv" if fmt == ExportFormat.CSV else "application/x-ndjson"
+
+    async def stream(
+        self,
+        request: Request,
+        dataset: ExportDataset,
+        fmt: ExportFormat,
+        match: Optional[dict] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield the export one encoded chunk per batch. Only one batch of rows
+        is held at a time, and the stream stops when the client disconnects.
+        """
+        spec = EXPORT_SPECS[dataset]
+        match = dict(match or {})
+        if since or until:
+            match[spec.date_field] = {
+                **({"$gte": since} if since else {}),
+                **({"$lt": until} if until else {}),
+            }
+
+        # Project only what the columns need
+        projection = {
+            name: 1
+            for name in spec.columns
+            if name != "id" and not name.endswith(("_id", "_name"))
+        }
+        for ref in spec.user_refs + spec.refs:
+            projection[ref] = 1
+
+        # Long scans; keep them off the primary when a secondary is available
+        cursor = secondary_aggregate(
+            spec.model,
+            [{"$match": match}, {"$project": projection}],
+            batchSize=EXPORT_BATCH_SIZE,
+        )
+
+        # Close the cursor however the stream ends (disconnect, cancellation,
+        # the response closing it early); otherwise it lives on server-side
+        # until MongoDB times it out
+        try:
+            if fmt == ExportFormat.CSV:
+                yield self._encode_csv([spec.columns])
+
+            # Per-export cache of resolved user names
+            names: Dict[ObjectId, str] = {}
+            batch: List[dict] = []
+            async for doc in cursor:
+                batch.append(doc)
+                if len(batch) < EXPORT_BATCH_SIZE:
+                    continue
+                if await request.is_disconnected():
+                    logger.info(f"Client disconnected during {dataset.value} export")
+                    return
+                yield await self._encode_batch(spec, fmt, batch, names)
+                batch = []
+
+            if batch:
+                yield await self._encode_batch(spec, fmt, batch, names)
+        finally:
+            await cursor.close()
+
+    async def _encode_batch(
+        self,
+        spec: ExportSpec,
+        fmt: ExportFormat,
+        docs: List[dict],
+        names: Dict[ObjectId, str]
+    ) -> bytes:
+        await self._resolve_names(spec, docs, names)
+
+        rows = []
+        for doc in docs:
+            row = {"id": str(doc["_id"])}
+            for ref in spec.user_refs + spec.refs:
+                ref_id = self._ref_id(doc.get(ref))
+                row[f"{ref}_id"] = str(ref_id) if ref_id else None
+                if ref in spec.user_refs:
+                    row[f"{ref}_name"] = names.get(ref_id, "Unknown")
+            for name in spec.columns:
+                if name not in row:
+                    row[name] = _serialize(doc.get(name))
+            rows.append(row)
+
+        if fmt == ExportFormat.CSV:
+            return self._encode_csv([[row[name] for name in spec.columns] for row in rows])
+        return "".join(
+            json.dumps({name: row[name] for name in spec.columns}, default=str) + "\n"
+            for row in rows
+        ).encode()
+
+    async def _resolve_names(self, spec: ExportSpec, docs: List[dict], names: Dict[ObjectId, str]) -> None:
+        """Look up every unseen user referenced by the batch with one `$in` query"""
+        needed = {
+            ref_id
+            for doc in docs
+            for ref in spec.user_refs
+            if (ref_id := self._ref_id(doc.get(ref)))
+        }
+        missing = needed - names.keys()
+        if len(names) + len(missing) > NAME_CACHE_SIZE:
+            names.clear()
+            missing = needed
+        if not missing:
+            return
+
+        users = await secondary_aggregate(User, [
+            {"$match": {"_id": {"$in": list(missing)}}},
+            {"$project": {"first_name": 1, "last_name": 1}},
+        ]).to_list()
+        for user in users:
+            names[user["_id"]] = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
+
+    @staticmethod
+    def _ref_id(value: Any) -> Optional[ObjectId]:
+        if isinstance(value, DBRef):
+            return value.id
+        if isinstance(value, dict):
+            return value.get("$id") or value.get("_id")
+        return value
+
+    @staticmethod
+    def _encode_csv(rows: List[List[Any]]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+
+# Singleton instance
+export_service = ExportService()
@@ -4,10 +4,12 @@ Session Service - Business logic for session management
 from typing import List, Optional
 from datetime import datetime
 from beanie import PydanticObjectId
-from beanie.operators import Or, In
+from beanie.operators import Or, In, Inc, Set
 
 from app.models.session import Session, SessionStatus
 from app.models.user import User, AvailabilityStatus
+from app.core.cache import invalidate_users
+from app.services.stats_service import stats_service
 
 
 class SessionService:
@@ -135,8 +137,8 @@ class SessionService:
         
         # Mark consultant as busy
         if isinstance(session.consultant, User):
-            session.consultant.status = AvailabilityStatus.BUSY
-            await session.consultant.save()
+            await session.consultant.set({User.status: AvailabilityStatus.BUSY})
+            await invalidate_users([session.consultant.id])
         
         await session.save()
         return session
@@ -162,21 +164,19 @@ class SessionService:
             cost = rate * duration_minutes
             
             # Deduct from client
-            client = session.client
-            client.credits -= cost
-            await client.save()
+            await session.client.inc({User.credits: -cost})
             
             # Add to consultant
             consultant = session.consultant
-            consultant.credits += cost
-            consultant.status = AvailabilityStatus.ONLINE
-            await consultant.save()
+            await consultant.update(Inc({User.credits: cost}), Set({User.status: AvailabilityStatus.ONLINE}))
+            await invalidate_users([session.client.id, consultant.id])
             
             session.total_cost = cost
             session.is_paid = True
             session.actual_duration_seconds = int(duration_seconds)
         
         await session.save()
+        await stats_service.record_session_completed(session)
         return session
     
     @staticmethod
@@ -192,8 +192,8 @@ class SessionService:
         
         # Make consultant available again if they were busy
         if isinstance(session.consultant, User) and session.consultant.status == AvailabilityStatus.BUSY:
-            session.consultant.status = AvailabilityStatus.ONLINE
-            await session.consultant.save()
+            await session.consultant.set({User.status: AvailabilityStatus.ONLINE})
+            await invalidate_users([session.consultant.id])
         
         await session.save()
         return session
@@ -0,0 +1,221 @@
+"""
+Similarity Service - "Consultants like this one" from precomputed TF-IDF vectors
+"""
+import asyncio
+import logging
+from itertools import chain
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.user import AvailabilityStatus, build_keywords, normalize_search_text
+from app.services.catalog_service import CatalogSnapshot, catalog_service
+
+logger = logging.getLogger(__name__)
+
+# How much each profile field counts towards similarity
+SKILL_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.5
+HEADLINE_WEIGHT = 0.3
+
+# Candidates ranked per requested result, leaving room for live filtering
+CANDIDATES_PER_RESULT = 4
+
+
+# Profile content a consultant's terms are derived from
+FeatureKey = Tuple[FrozenSet[str], str, Optional[str]]
+
+# A fresh vocabulary is started once this share of its terms is unused
+MAX_UNUSED_TERMS = 0.5
+
+
+class SimilarityIndex:
+    """
+    L2-normalized TF-IDF vectors over skills, category and headline words,
+    stored sparse in NumPy arrays both by consultant (CSR) and by term (CSC),
+    so one consultant's cosine similarity to everyone is a handful of
+    vectorized adds.
+
+    Tokenizing profiles is the expensive part of a build, so each distinct
+    profile's terms are kept and handed on to the next build, together with
+    the vocabulary: a rebuild only tokenizes profiles that changed.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot, previous: Optional["SimilarityIndex"] = None):
+        self.snapshot = snapshot
+        records = snapshot.records
+        self.ids: List[str] = [r.id for r in records]
+        self.rows: Dict[str, int] = {id_: row for row, id_ in enumerate(self.ids)}
+        online = AvailabilityStatus.ONLINE.value
+        self.online = np.fromiter((r.status == online for r in records), dtype=bool, count=len(records))
+        self.prices = np.array([np.nan if r.price is None else r.price for r in records], dtype=np.float64)
+
+        # Field-weighted term frequencies per consultant, as (columns, weights)
+        self.vocabulary: Dict[str, int] = dict(previous.vocabulary) if previous else {}
+        known = previous.features if previous else {}
+        self.features: Dict[FeatureKey, Tuple[Tuple[int, ...], Tuple[float, ...]]] = {}
+        skill_terms: Dict[str, str] = {}
+        row_features = []
+        for record in records:
+            key = (record.skills, record.category, record.response.get("headline"))
+            features = known.get(key) or self.features.get(key)
+            if features is None:
+                features = self._tokenize(key, skill_terms)
+            self.features[key] = features
+            row_features.append(features)
+
+        count = len(records)
+        lengths = np.fromiter((len(cols) for cols, _ in row_features), dtype=np.int64, count=count)
+        nnz = int(lengths.sum())
+        row_index = np.repeat(np.arange(count, dtype=np.int32), lengths)
+        col_index = np.fromiter(chain.from_iterable(cols for cols, _ in row_features), dtype=np.int32, count=nnz)
+        values = np.fromiter(chain.from_iterable(w for _, w in row_features), dtype=np.float32, count=nnz)
+
+        # Smoothed inverse document frequency, then unit-length rows
+        document_frequency = np.bincount(col_index, minlength=len(self.vocabulary))
+        self.unused_terms = int(np.count_nonzero(document_frequency == 0))
+        idf = np.log((1 + count) / (1 + document_frequency)) + 1
+        values *= idf[col_index].astype(np.float32)
+        norms = np.sqrt(np.bincount(row_index, weights=values.astype(np.float64) ** 2, minlength=count))
+        norms[norms == 0] = 1
+        values /= norms[row_index].astype(np.float32)
+
+        # CSR: row_index is already sorted
+        self.row_ptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.row_cols = col_index
+        self.row_values = values
+
+        # CSC: postings per term
+        order = np.argsort(col_index, kind="stable")
+        self.col_ptr = np.concatenate(([0], np.cumsum(document_frequency)))
+        self.col_rows = row_index[order]
+        self.col_values = values[order]
+
+    def _tokenize(self, key: FeatureKey, skill_terms: Dict[str, str]) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+        """Columns and field weights of one profile's terms, extending the vocabulary"""
+        skills, category, headline = key
+        features = []
+        for skill in skills:
+            if skill not in skill_terms:
+                skill_terms[skill] = f"skill:{normalize_search_text(skill).strip()}"
+            features.append((skill_terms[skill], SKILL_WEIGHT))
+        if category:
+            features.append((f"category:{category}", CATEGORY_WEIGHT))
+        features += [(f"word:{w}", HEADLINE_WEIGHT) for w in build_keywords(headline)]
+
+        terms: Dict[int, float] = {}
+        for term, weight in features:
+            column = self.vocabulary.setdefault(term, len(self.vocabulary))
+            terms[column] = max(terms.get(column, 0.0), weight)
+        return tuple(terms), tuple(terms.values())
+
+    def similar(
+        self,
+        user_id: str,
+        limit: int = 5,
+        available_now: bool = False,
+        max_price: Optional[float] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Most similar consultants, best first; None for unknown consultants"""
+        row = self.rows.get(user_id)
+        if row is None:
+            return None
+
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for col, weight in zip(self.row_cols[self.row_ptr[row]:self.row_ptr[row + 1]],
+                               self.row_values[self.row_ptr[row]:self.row_ptr[row + 1]]):
+            start, end = self.col_ptr[col], self.col_ptr[col + 1]
+            # Rows are unique within a posting list, so fancy-index += is safe
+            scores[self.col_rows[start:end]] += weight * self.col_values[start:end]
+
+        mask = scores > 0
+        mask[row] = False
+        if available_now:
+            mask &= self.online
+        if max_price is not None:
+            mask &= self.prices < max_price  # NaN (unpriced) compares False
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return []
+
+        pool = min(candidates.size, limit * CANDIDATES_PER_RESULT)
+        top = candidates[np.argpartition(-scores[candidates], pool - 1)[:pool]]
+        top = top[np.lexsort((top, -scores[top]))]
+
+        # Vectors are rebuilt periodically; availability and price are
+        # re-checked against the live catalog
+        live = catalog_service.snapshot
+        results = []
+        for candidate in top:
+            record = self.snapshot.records[candidate]
+            if live is not None and live is not self.snapshot:
+                record = live.by_id.get(record.id)
+                if record is None:
+                    continue
+                if available_now and record.status != AvailabilityStatus.ONLINE.value:
+                    continue
+                if max_price is not None and (record.price is None or record.price >= max_price):
+                    continue
+            results.append(record.response)
+            if len(results) >= limit:
+                break
+        return results
+
+
+class SimilarityService:
+    """Keeps a SimilarityIndex over the consultant catalog, rebuilt in the background"""
+
+    def __init__(self):
+        self.index: Optional[SimilarityIndex] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> None:
+        """Rebuild the vectors if the catalog changed since the last build"""
+        snapshot = catalog_service.snapshot
+        if snapshot is None or (self.index is not None and self.index.snapshot is snapshot):
+            return
+        # Building is CPU-bound; keep it off the event loop. Profiles that
+        # haven't changed reuse their terms, unless the vocabulary has
+        # accumulated too many terms nobody lists anymore
+        previous = self.index
+        if previous is not None and previous.unused_terms > len(previous.vocabulary) * MAX_UNUSED_TERMS:
+            previous = None
+        self.index = await asyncio.to_thread(SimilarityIndex, snapshot, previous)
+        logger.info(f"Similarity index built for {len(self.index.ids)} consultants")
+
+    async def start(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Similarity index build failed: {e}")
+        self._refresh_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.SIMILARITY_REFRESH_SECONDS)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Similarity index refresh failed: {e}")
+
+    def similar(
+        self,
+        user_id: str,
+        limit: int = 5,
+        available_now: bool = False,
+        max_price: Optional[float] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Similar consultants; None while no index is built or for unknown ids"""
+        if self.index is None:
+            return None
+        return self.index.similar(user_id, limit, available_now, max_price)
+
+
+# Singleton instance
+similarity_service = SimilarityService()
@@ -0,0 +1,215 @@
+"""
+Stats Service - Materialized daily rollups for admin analytics
+"""
+import asyncio
+import logging
+from typing import Dict, Optional, Iterable
+from datetime import datetime, date, time, timedelta, timezone, tzinfo
+
+from pymongo.errors import DuplicateKeyError
+
+from app.db.mongodb import secondary_aggregate
+from app.models.daily_stats import DailyStats
+from app.models.session import Session, SessionStatus
+from app.models.user import User, UserRole
+from app.models.review import Review
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# Rollup buckets per UTC day: quarter hours fit every time zone's offset
+MINUTES_PER_BUCKET = 15
+
+# Days upserted concurrently by `rebuild`
+REBUILD_BATCH_SIZE = 100
+
+
+def day_bucket(at: datetime) -> int:
+    """Quarter of the (UTC) day that `at` falls in"""
+    return (at.hour * 60 + at.minute) // MINUTES_PER_BUCKET
+
+
+class StatsService:
+    """Service that keeps the `daily_stats` rollup collection up to date"""
+
+    @staticmethod
+    async def _increment(at: datetime, counters: Dict[str, float]) -> None:
+        """Atomically add counters to the day (and quarter hour) containing `at`"""
+        day = at.strftime(DATE_FORMAT)
+        bucket = str(day_bucket(at))
+
+        inc = {}
+        for field, amount in counters.items():
+            inc[field] = amount
+            inc[f"quarter_hours.{bucket}.{field}"] = amount
+
+        # Rollups must never fail the user-facing write that triggered them;
+        # a missed increment is repaired by `rebuild`.
+        try:
+            try:
+                await DailyStats.find_one(DailyStats.date == day).update({"$inc": inc}, upsert=True)
+            except DuplicateKeyError:
+                # Another write created the day's document first; it exists now
+                await DailyStats.find_one(DailyStats.date == day).update({"$inc": inc})
+        except Exception as e:
+            logger.error(f"Failed to update daily stats for {day}: {e}")
+
+    @staticmethod
+    async def record_session_completed(session: Session) -> None:
+        """Count a completed session and its revenue"""
+        await StatsService._increment(
+            session.actual_end_time or datetime.utcnow(),
+            {"sessions_completed": 1, "revenue": session.total_cost or 0.0}
+        )
+
+    @staticmethod
+    async def record_user_registered(user: User) -> None:
+        """Count a new signup"""
+        counters = {"signups": 1}
+        if user.role == UserRole.CLIENT:
+            counters["new_clients"] = 1
+        elif user.role == UserRole.CONSULTANT:
+            counters["new_consultants"] = 1
+        await StatsService._increment(user.created_at, counters)
+
+    @staticmethod
+    async def record_review_created(review: Review) -> None:
+        """Count a new review and its rating"""
+        await StatsService._increment(review.created_at, {"reviews": 1, "rating_sum": review.rating})
+
+    @staticmethod
+    async def get_daily_series(
+        days: int,
+        tz: tzinfo,
+        fields: Iterable[str]
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Sum `fields` per local day in `tz` over the last `days` days.
+        Reads one small rollup document per UTC day in the window.
+        """
+        fields = list(fields)
+        now_local = datetime.now(tz)
+        start_local = now_local.date() - timedelta(days=days)
+
+        # UTC days overlapping the local window
+        start_utc = datetime.combine(start_local, time.min, tz).astimezone(timezone.utc).date()
+        end_utc = now_local.astimezone(timezone.utc).date()
+
+        rollups = await secondary_aggregate(DailyStats, [
+            {"$match": {"date": {
+                "$gte": start_utc.strftime(DATE_FORMAT),
+                "$lte": end_utc.strftime(DATE_FORMAT),
+            }}},
+            {"$project": {"date": 1, "quarter_hours": 1, "hourly": 1}},
+        ]).to_list()
+
+        series: Dict[str, Dict[str, float]] = {}
+        for rollup in rollups:
+            day_start = datetime.strptime(rollup["date"], DATE_FORMAT).replace(tzinfo=timezone.utc)
+            buckets = [
+                (timedelta(minutes=int(quarter) * MINUTES_PER_BUCKET), counters)
+                for quarter, counters in rollup.get("quarter_hours", {}).items()
+            ] + [
+                # Written before quarter hours, until `rebuild` converts them
+                (timedelta(hours=int(hour)), counters)
+                for hour, counters in rollup.get("hourly", {}).items()
+            ]
+            for offset, counters in buckets:
+                local_day = (day_start + offset).astimezone(tz).date()
+                if local_day < start_local:
+                    continue
+                bucket = series.setdefault(local_day.strftime(DATE_FORMAT), dict.fromkeys(fields, 0))
+                for field in fields:
+                    bucket[field] += counters.get(field, 0)
+
+        return series
+
+    @staticmethod
+    async def rebuild(since: Optional[date] = None) -> int:
+        """
+        Recompute rollups from the source collections (all history, or from
+        `since` onwards). Returns the number of days written.
+        """
+        since_dt = datetime.combine(since, time.min) if since else None
+
+        def bucket_id(date_field) -> dict:
+            # Same bucketing as `day_bucket`
+            return {
+                "day": {"$dateToString": {"format": DATE_FORMAT, "date": date_field}},
+                "quarter": {"$add": [
+                    {"$multiply": [{"$hour": date_field}, 60 // MINUTES_PER_BUCKET]},
+                    {"$trunc": {"$divide": [{"$minute": date_field}, MINUTES_PER_BUCKET]}},
+                ]},
+            }
+
+        def since_match(field: str) -> dict:
+            return {field: {"$gte": since_dt}} if since_dt else {}
+
+        completed_at = {"$ifNull": ["$actual_end_time", "$created_at"]}
+        session_rows = await Session.aggregate([
+            {"$match": {"status": SessionStatus.COMPLETED.value}},
+            {"$addFields": {"_completed_at": completed_at}},
+            {"$match": since_match("_completed_at")},
+            {"$group": {
+                "_id": bucket_id("$_completed_at"),
+                "sessions_completed": {"$sum": 1},
+                "revenue": {"$sum": {"$ifNull": ["$total_cost", 0]}},
+            }},
+        ]).to_list()
+
+        user_rows = await User.aggregate([
+            {"$match": since_match("created_at")},
+            {"$group": {
+                "_id": bucket_id("$created_at"),
+                "signups": {"$sum": 1},
+                "new_clients": {"$sum": {"$cond": [{"$eq": ["$role", UserRole.CLIENT.value]}, 1, 0]}},
+                "new_consultants": {"$sum": {"$cond": [{"$eq": ["$role", UserRole.CONSULTANT.value]}, 1, 0]}},
+            }},
+        ]).to_list()
+
+        review_rows = await Review.aggregate([
+            {"$match": since_match("created_at")},
+            {"$group": {
+                "_id": bucket_id("$created_at"),
+                "reviews": {"$sum": 1},
+                "rating_sum": {"$sum": "$rating"},
+            }},
+        ]).to_list()
+
+        rollups: Dict[str, DailyStats] = {}
+        for row in session_rows + user_rows + review_rows:
+            bucket = row.pop("_id")
+            rollup = rollups.setdefault(bucket["day"], DailyStats(date=bucket["day"]))
+            quarter = rollup.quarter_hours.setdefault(str(int(bucket["quarter"])), {})
+            for field, amount in row.items():
+                setattr(rollup, field, getattr(rollup, field) + amount)
+                quarter[field] = quarter.get(field, 0) + amount
+
+        # Overwrite each day in place, so the dashboard never sees the
+        # rollups missing while a rebuild runs
+        days = list(rollups.values())
+        for start in range(0, len(days), REBUILD_BATCH_SIZE):
+            await asyncio.gather(*(
+                DailyStats.find_one(DailyStats.date == rollup.date).update(
+                    {
+                        "$set": rollup.model_dump(exclude={"id", "revision_id", "hourly"}),
+                        "$unset": {"hourly": ""},
+                    },
+                    upsert=True,
+                )
+                for rollup in days[start:start + REBUILD_BATCH_SIZE]
+            ))
+
+        # Days in range that no longer have any activity
+        stale = {"date": {"$nin": list(rollups)}}
+        if since:
+            stale["date"]["$gte"] = since.strftime(DATE_FORMAT)
+        await DailyStats.find(stale).delete()
+
+        logger.info(f"Rebuilt daily stats for {len(rollups)} days")
+        return len(rollups)
+
+
+# Singleton instance
+stats_service = StatsService()
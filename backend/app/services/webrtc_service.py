@@ -1,55 +1,135 @@
 """
 WebRTC Service - Configuration for ICE servers including TURN
 """
-from typing import List, Dict
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
 from app.core.config import settings
 
+# Google's public STUN servers
+STUN_URLS = ["stun:stun.l.google.com:19302", "stun:stun1.l.google.com:19302"]
+
+ICE_CANDIDATE_POOL_SIZE = 10
+
+# Minted credentials are reissued once less than this share of their TTL is
+# left, so clients always receive credentials that last through a session
+RENEW_AT_REMAINING = 0.25
+
+# Users whose serialized configuration is kept around
+MAX_CACHED_USERS = 10000
+
+
+def _json(value) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class _UserConfig:
+    __slots__ = ("renew_at", "rtc_configuration", "ice_servers")
+
+    def __init__(self, renew_at: float, rtc_configuration: bytes, ice_servers: bytes):
+        self.renew_at = renew_at
+        self.rtc_configuration = rtc_configuration
+        self.ice_servers = ice_servers
+
 
 class WebRTCService:
-    """Service for WebRTC configuration"""
-    
-    @staticmethod
-    def get_ice_servers() -> List[Dict]:
-        """
-        Get ICE servers configuration for WebRTC.
-        Includes STUN and TURN servers if configured.
-        """
-        servers = [
-            # Google's public STUN server
-            {"urls": "stun:stun.l.google.com:19302"},
-            {"urls": "stun:stun1.l.google.com:19302"},
-        ]
-        
-        # Add TURN server if configured
+    """
+    Serves ICE configuration as ready-made JSON.
+
+    With TURN_SECRET set, every user gets their own time-limited TURN
+    credentials (the TURN REST API scheme: username "<expiry>:<user id>",
+    password base64(HMAC-SHA1(secret, username))), so a leaked credential
+    stops working on its own. Each user's JSON is cached until their
+    credentials near expiry. Without a secret, the static
+    TURN_SERVER_USERNAME / TURN_SERVER_CREDENTIAL are shared by everyone.
+    """
+
+    def __init__(self):
+        self.secret = settings.TURN_SECRET
+        self.ttl = settings.TURN_CREDENTIAL_TTL_SECONDS
+        self.stun_servers = [{"urls": url} for url in STUN_URLS]
+
+        self.turn_urls: List[str] = []
         if settings.TURN_SERVER_URL:
-            turn_config = {
-                "urls": settings.TURN_SERVER_URL,
-            }
-            
-            if settings.TURN_SERVER_USERNAME:
-                turn_config["username"] = settings.TURN_SERVER_USERNAME
-            
-            if settings.TURN_SERVER_CREDENTIAL:
-                turn_config["credential"] = settings.TURN_SERVER_CREDENTIAL
-            
-            servers.append(turn_config)
-            
-            # Also add TURNS (TURN over TLS) if it's a turn: URL
+            self.turn_urls.append(settings.TURN_SERVER_URL)
+            # Also offer TURNS (TURN over TLS) for a turn: URL
             if settings.TURN_SERVER_URL.startswith("turn:"):
-                turns_url = settings.TURN_SERVER_URL.replace("turn:", "turns:", 1)
-                turns_config = turn_config.copy()
-                turns_config["urls"] = turns_url
-                servers.append(turns_config)
-        
+                self.turn_urls.append(settings.TURN_SERVER_URL.replace("turn:", "turns:", 1))
+
+        self._users: Dict[str, _UserConfig] = {}
+
+        # Everything but minted credentials is serialized once; per-user
+        # JSON only splices the TURN entries in
+        static_servers = self.stun_servers + (
+            [] if self.secret else self._turn_servers(settings.TURN_SERVER_USERNAME, settings.TURN_SERVER_CREDENTIAL)
+        )
+        servers_json = _json(static_servers)
+        self._servers_prefix = servers_json[:-1]  # Without the closing "]"
+        self._separator = b"," if static_servers else b""
+        self._rtc_prefix = b'{"iceServers":' + self._servers_prefix
+        self._rtc_suffix = b'],"iceCandidatePoolSize":' + str(ICE_CANDIDATE_POOL_SIZE).encode() + b"}"
+        self._static = _UserConfig(
+            float("inf"),
+            self._rtc_prefix + self._rtc_suffix,
+            b'{"iceServers":' + servers_json + b"}",
+        )
+
+    @property
+    def mints_credentials(self) -> bool:
+        return bool(self.secret and self.turn_urls)
+
+    def turn_credentials(self, user_id: str, now: Optional[float] = None) -> Tuple[str, str, int]:
+        """Mint (username, credential, expires_at) for `user_id`"""
+        expires_at = int(now if now is not None else time.time()) + self.ttl
+        username = f"{expires_at}:{user_id}"
+        digest = hmac.new(self.secret.encode(), username.encode(), hashlib.sha1).digest()
+        return username, base64.b64encode(digest).decode(), expires_at
+
+    def get_rtc_configuration(self, user_id: str) -> bytes:
+        """Full RTCPeerConnection configuration, as JSON"""
+        return self._config(user_id).rtc_configuration
+
+    def get_ice_servers(self, user_id: str) -> bytes:
+        """{"iceServers": [...]} only, as JSON"""
+        return self._config(user_id).ice_servers
+
+    def _config(self, user_id: str) -> _UserConfig:
+        if not self.mints_credentials:
+            return self._static
+
+        now = time.time()
+        config = self._users.get(user_id)
+        if config is not None and now < config.renew_at:
+            return config
+
+        username, credential, expires_at = self.turn_credentials(user_id, now)
+        turn_json = _json(self._turn_servers(username, credential))[1:-1]
+        config = _UserConfig(
+            renew_at=expires_at - self.ttl * RENEW_AT_REMAINING,
+            rtc_configuration=self._rtc_prefix + self._separator + turn_json + self._rtc_suffix,
+            ice_servers=b'{"iceServers":' + self._servers_prefix + self._separator + turn_json + b"]}",
+        )
+        self._users.pop(user_id, None)
+        self._users[user_id] = config
+        while len(self._users) > MAX_CACHED_USERS:
+            # Dicts keep insertion order, so the first key is the oldest mint
+            del self._users[next(iter(self._users))]
+        return config
+
+    def _turn_servers(self, username: Optional[str], credential: Optional[str]) -> List[Dict]:
+        servers = []
+        for url in self.turn_urls:
+            server = {"urls": url}
+            if username:
+                server["username"] = username
+            if credential:
+                server["credential"] = credential
+            servers.append(server)
         return servers
-    
-    @staticmethod
-    def get_rtc_configuration() -> Dict:
-        """Get full RTCPeerConnection configuration"""
-        return {
-            "iceServers": WebRTCService.get_ice_servers(),
-            "iceCandidatePoolSize": 10,
-        }
 
 
 # Singleton instance
@@ -0,0 +1,126 @@
+"""
+Benchmark consultant discovery search on a synthetic catalog.
+
+Seeds a separate `<DATABASE_NAME>_bench` database with consultants (only
+the first run pays for seeding) and compares the old OR of unanchored
+regexes with the ranked text / typeahead search used by
+/users/consultants.
+
+Usage:
+    python bench_consultant_search.py [--consultants 100000] [--runs 30]
+"""
+import argparse
+import asyncio
+import random
+import re
+import statistics
+import sys
+import time
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.db import mongodb
+from app.models.user import User, UserRole, build_search_keys, build_keywords
+from app.api.v1.endpoints.users import query_consultants
+from app.services.catalog_service import ConsultantFilters
+
+# Fix for Windows Event Loop
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+FIRST_NAMES = ["James", "Maria", "Wei", "Aisha", "Lukas", "Sofia", "Arjun", "Chloe", "Mateo", "Yuki"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Okafor", "Müller", "Rossi", "Patel", "Martin", "López", "Tanaka"]
+SKILLS = [
+    "React", "TypeScript", "Python", "Django", "Kubernetes", "AWS", "Figma", "SEO",
+    "Fundraising", "Contracts", "Tax", "Branding", "Go", "Rust", "Data Science", "UX Research",
+]
+ROLES = ["Engineer", "Designer", "Consultant", "Advisor", "Architect", "Strategist"]
+CATEGORIES = ["Dev", "Design", "Marketing", "Legal", "Finance", "Startup"]
+QUERIES = ["react", "python engineer", "kubernetes", "tax advisor", "figma designer", "seo"]
+TYPEAHEAD = ["re", "reac", "pyth", "kub", "desig", "fund"]
+
+
+async def seed(count: int) -> None:
+    existing = await User.find(User.role == UserRole.CONSULTANT).count()
+    if existing >= count:
+        print(f"Using existing {existing} consultants")
+        return
+
+    print(f"Seeding {count - existing} consultants...")
+    for start in range(existing, count, 5000):
+        batch = []
+        for i in range(start, min(start + 5000, count)):
+            first, last = random.choice(FIRST_NAMES), random.choice(LAST_NAMES)
+            skills = random.sample(SKILLS, 3)
+            headline = f"{random.choice(['Senior', 'Lead', 'Freelance'])} {skills[0]} {random.choice(ROLES)}"
+            email = f"consultant{i}@example.com"
+            batch.append(User(
+                email=email,
+                hashed_password="x",
+                first_name=first,
+                last_name=last,
+                role=UserRole.CONSULTANT,
+                headline=headline,
+                bio=f"{headline} helping teams with {', '.join(skills)}.",
+                skills=skills,
+                category=random.choice(CATEGORIES),
+                price_per_minute=round(random.uniform(0.5, 10), 2),
+                rating=round(random.uniform(3, 5), 1),
+                search_keys=build_search_keys(email, first, last),
+                keywords=build_keywords(first, last, headline, *skills),
+            ))
+        await User.insert_many(batch)
+
+
+async def time_query(label: str, queries, run, runs: int) -> None:
+    samples = []
+    for _ in range(runs):
+        query = random.choice(queries)
+        started = time.perf_counter()
+        await run(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<24} p50={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--consultants", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    database = client[f"{settings.DATABASE_NAME}_bench"]
+    await init_beanie(database=database, document_models=[User])
+    # Route the secondary reads at the bench database too
+    mongodb.secondary_db = database
+    await seed(args.consultants)
+
+    async def regex_scan(query: str):
+        # The previous implementation, kept here as the baseline
+        safe = re.escape(query)
+        return await User.find(User.role == UserRole.CONSULTANT, {"$or": [
+            {"first_name": {"$regex": safe, "$options": "i"}},
+            {"last_name": {"$regex": safe, "$options": "i"}},
+            {"headline": {"$regex": safe, "$options": "i"}},
+            {"skills": {"$in": [query]}},
+        ]}).limit(10).to_list()
+
+    consultants = ConsultantFilters()
+
+    async def text_search(query: str):
+        return await query_consultants(consultants, query, False, 0, 10)
+
+    async def typeahead(query: str):
+        return await query_consultants(consultants, query, True, 0, 10)
+
+    await time_query("unanchored regex scan", QUERIES, regex_scan, args.runs)
+    await time_query("ranked text search", QUERIES, text_search, args.runs)
+    await time_query("typeahead prefix search", TYPEAHEAD, typeahead, args.runs)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""
+Benchmark outbound email throughput against a local SMTP stand-in.
+
+Starts a minimal in-process SMTP server (it accepts and discards mail) with
+an artificial delay on connect and AUTH standing in for the TCP, STARTTLS
+and login round trips of a real provider. Compares one connection per
+message (the previous `aiosmtplib.send` path) with the pooled connections
+EmailService now uses.
+
+Usage:
+    python bench_email.py [--messages 200] [--concurrency 10] [--handshake-ms 50]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from email.mime.text import MIMEText
+
+import aiosmtplib
+
+from app.services.email_service import SMTPConnectionPool
+
+# Fix for Windows Event Loop
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+class FakeSMTPServer:
+    """Just enough SMTP (EHLO, AUTH, MAIL, RCPT, DATA, NOOP, RSET, QUIT) to accept mail"""
+
+    def __init__(self, handshake_delay: float):
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+        self.messages = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+
+        def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+
+        await asyncio.sleep(self.handshake_delay)
+        reply("220 localhost fake SMTP")
+        try:
+            while line := await reader.readline():
+                command = line.decode(errors="replace").strip().upper()
+                if command.startswith(("EHLO", "HELO")):
+                    writer.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+                elif command.startswith("AUTH"):
+                    await asyncio.sleep(self.handshake_delay)
+                    reply("235 2.7.0 Authentication successful")
+                elif command == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b""):
+                        pass
+                    self.messages += 1
+                    reply("250 OK queued")
+                elif command == "QUIT":
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    reply("250 OK")
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+def build_message(i: int) -> MIMEText:
+    message = MIMEText(f"<p>Benchmark message {i}</p>", "html")
+    message["Subject"] = f"Benchmark {i}"
+    message["From"] = "MicroConsult <noreply@example.com>"
+    message["To"] = f"user{i}@example.com"
+    return message
+
+
+async def run(label: str, send, messages: int, concurrency: int, server: FakeSMTPServer) -> None:
+    queue = list(range(messages))
+    connections_before = server.connections
+
+    async def worker() -> None:
+        while queue:
+            await send(build_message(queue.pop()))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<26} {messages / elapsed:8.1f} msg/s  "
+        f"({server.connections - connections_before} connections for {messages} messages)"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=3)
+    parser.add_argument("--handshake-ms", type=float, default=50, help="Simulated connect + AUTH latency")
+    args = parser.parse_args()
+
+    server = FakeSMTPServer(args.handshake_ms / 1000)
+    smtp_server = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = smtp_server.sockets[0].getsockname()[1]
+
+    async def connection_per_message(message) -> None:
+        # The previous implementation, kept here as the baseline
+        await aiosmtplib.send(
+            message, hostname="127.0.0.1", port=port, username="bench", password="bench", start_tls=False
+        )
+
+    pool = SMTPConnectionPool(
+        hostname="127.0.0.1", port=port, username="bench", password="bench",
+        start_tls=False, size=args.pool_size
+    )
+
+    await run("connection per message", connection_per_message, args.messages, args.concurrency, server)
+    await run("pooled connections", pool.send, args.messages, args.concurrency, server)
+
+    await pool.close()
+    smtp_server.close()
+    await smtp_server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
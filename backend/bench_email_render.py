@@ -0,0 +1,71 @@
+"""
+Benchmark the CPU cost of producing one notification email.
+
+Measures render + MIME assembly + serialization per email, comparing the
+precompiled templates EmailService uses (stylesheet inlined once, at
+compile time) with loading, inlining and compiling the template on every
+email.
+
+Usage:
+    python bench_email_render.py [--emails 2000]
+"""
+import argparse
+import statistics
+import time
+
+from jinja2 import Environment, select_autoescape
+
+from app.core.config import settings
+from app.services.email_service import (
+    STYLESHEET_TEMPLATE, TEMPLATES_DIR, InlineCSSLoader, email_service
+)
+
+CONTEXT = {
+    "subject": "New Session Request: Scaling a Postgres cluster",
+    "consultant_name": "Maria",
+    "client_name": "James Smith",
+    "session_topic": "Scaling a Postgres cluster",
+    "scheduled_time": "Oct 19, 2026 at 15:00 UTC",
+    "rate_per_minute": "2.50",
+    "message": "We're hitting <connection limits> & want a second opinion.",
+    "year": 2026,
+}
+
+
+def run(label: str, render, emails: int) -> None:
+    samples = []
+    for i in range(emails):
+        started = time.process_time()
+        html = render()
+        email_service.build_message(f"user{i}@example.com", CONTEXT["subject"], html).as_bytes()
+        samples.append((time.process_time() - started) * 1e6)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<28} mean={statistics.fmean(samples):8.1f}us  p95={p95:8.1f}us  CPU per email")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=2000)
+    args = parser.parse_args()
+
+    def compile_per_email() -> str:
+        # What rendering costs without the compiled-template cache
+        env = Environment(
+            loader=InlineCSSLoader(str(TEMPLATES_DIR), STYLESHEET_TEMPLATE),
+            autoescape=select_autoescape(['html', 'xml']),
+            cache_size=0
+        )
+        return env.get_template("session_request.html").render(app_url=settings.FRONTEND_URL, **CONTEXT)
+
+    template = email_service.templates["session_request"]
+
+    def precompiled() -> str:
+        return template.render(**CONTEXT)
+
+    run("compile per email", compile_per_email, max(1, args.emails // 10))
+    run("precompiled template", precompiled, args.emails)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark admin user search on a synthetic users collection.
+
+Seeds a separate `<DATABASE_NAME>_bench` database (only the first run pays
+for seeding) and compares the old unanchored case-insensitive regex scan
+with the indexed prefix search used by /admin/users.
+
+Usage:
+    python bench_user_search.py [--users 1000000] [--runs 30]
+"""
+import argparse
+import asyncio
+import random
+import re
+import statistics
+import sys
+import time
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.models.user import User, UserRole, build_search_keys
+from app.api.v1.endpoints.admin import _search_users
+
+# Fix for Windows Event Loop
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+FIRST_NAMES = ["James", "Maria", "Wei", "Aisha", "Lukas", "Sofia", "Arjun", "Chloe", "Mateo", "Yuki"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Okafor", "Müller", "Rossi", "Patel", "Martin", "López", "Tanaka"]
+QUERIES = ["jam", "garcia", "wei chen", "user12345", "sof", "tanaka", "ok", "lopez"]
+
+
+async def seed(count: int) -> None:
+    existing = await User.count()
+    if existing >= count:
+        print(f"Using existing {existing} users")
+        return
+
+    print(f"Seeding {count - existing} users...")
+    for start in range(existing, count, 10000):
+        batch = []
+        for i in range(start, min(start + 10000, count)):
+            first, last = random.choice(FIRST_NAMES), random.choice(LAST_NAMES)
+            email = f"user{i}@example.com"
+            batch.append(User(
+                email=email,
+                hashed_password="x",
+                first_name=first,
+                last_name=last,
+                role=random.choice([UserRole.CLIENT, UserRole.CONSULTANT]),
+                search_keys=build_search_keys(email, first, last),
+            ))
+        await User.insert_many(batch)
+
+
+async def time_query(label: str, run, runs: int) -> None:
+    samples = []
+    for _ in range(runs):
+        query = random.choice(QUERIES)
+        started = time.perf_counter()
+        await run(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<22} p50={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await init_beanie(database=client[f"{settings.DATABASE_NAME}_bench"], document_models=[User])
+    await seed(args.users)
+
+    async def regex_scan(query: str):
+        # The previous implementation, kept here as the baseline
+        return await User.find({"$or": [
+            {"email": {"$regex": re.escape(query), "$options": "i"}},
+            {"first_name": {"$regex": re.escape(query), "$options": "i"}},
+            {"last_name": {"$regex": re.escape(query), "$options": "i"}},
+        ]}).sort("-created_at").limit(50).to_list()
+
+    async def prefix_search(query: str):
+        return await _search_users(query, None, 0, 50)
+
+    await time_query("unanchored regex scan", regex_scan, args.runs)
+    await time_query("indexed prefix search", prefix_search, args.runs)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
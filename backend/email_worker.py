@@ -0,0 +1,56 @@
+"""
+Email worker: delivers queued notification emails.
+
+Run one or more of these next to the API (the `email-worker` service in
+docker-compose.yml, `worker` in the Procfile); they share the queue
+safely. For local development, EMAIL_QUEUE_INLINE_WORKER=True lets the
+API deliver the queue itself instead.
+
+Usage:
+    python email_worker.py [--concurrency 4]
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+
+from app.core.config import settings
+from app.db.mongodb import init_db
+from app.services.email_queue_service import email_queue_service
+from app.services.email_service import email_service
+
+# Fix for Windows Event Loop
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("email_worker")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=settings.EMAIL_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    await init_db()
+
+    # Finish in-flight emails on SIGTERM / Ctrl+C instead of dropping them
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows
+
+    logger.info(f"Email worker started ({args.concurrency} concurrent sends)")
+    try:
+        await email_queue_service.run_worker(stop, concurrency=args.concurrency)
+    finally:
+        await email_service.close()
+    logger.info("Email worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,210 @@
+"""
+Maintenance commands.
+
+Usage:
+    python manage.py rebuild-daily-stats [--since YYYY-MM-DD]
+    python manage.py reindex-user-search
+    python manage.py backfill-review-authors
+    python manage.py rebuild-ratings
+    python manage.py requeue-dead-emails
+    python manage.py db-status
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+from app.db import mongodb
+from app.db.mongodb import init_db, pool_status, secondary_aggregate
+from app.models.user import User, UserRole, compute_bayesian_rating, build_search_keys, build_keywords
+from app.models.review import Review
+from app.services.email_queue_service import email_queue_service
+from app.services.stats_service import stats_service
+
+# Fix for Windows Event Loop
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+async def rebuild_daily_stats(args: argparse.Namespace) -> None:
+    since = datetime.strptime(args.since, "%Y-%m-%d").date() if args.since else None
+    days = await stats_service.rebuild(since=since)
+    print(f"Rebuilt daily stats for {days} days")
+
+
+async def reindex_user_search(args: argparse.Namespace) -> None:
+    """Backfill `search_keys` and `keywords` for users saved before they existed"""
+    batch, updated = [], 0
+
+    async def flush() -> None:
+        await asyncio.gather(*(
+            User.find_one(User.id == doc["_id"]).update({"$set": {
+                "search_keys": build_search_keys(doc["email"], doc["first_name"], doc["last_name"]),
+                "keywords": build_keywords(
+                    doc["first_name"], doc["last_name"], doc.get("headline"), *doc.get("skills", [])
+                ),
+            }})
+            for doc in batch
+        ))
+        batch.clear()
+
+    projection = {"email": 1, "first_name": 1, "last_name": 1, "headline": 1, "skills": 1}
+    async for doc in User.aggregate([{"$project": projection}]):
+        batch.append(doc)
+        if len(batch) >= 500:
+            updated += len(batch)
+            await flush()
+            print(f"Reindexed {updated} users...")
+    updated += len(batch)
+    await flush()
+    print(f"Reindexed {updated} users")
+
+
+async def backfill_review_authors(args: argparse.Namespace) -> None:
+    """Store the client's name and avatar on reviews written before they were denormalized"""
+    client_ids = [row["_id"] async for row in Review.aggregate([
+        {"$match": {"client_name": None}},
+        {"$group": {"_id": {"$getField": {"field": {"$literal": "$id"}, "input": "$client"}}}},
+    ])]
+
+    updated = 0
+    for start in range(0, len(client_ids), 500):
+        users = await User.aggregate([
+            {"$match": {"_id": {"$in": client_ids[start:start + 500]}}},
+            {"$project": {"first_name": 1, "last_name": 1, "avatar_url": 1}},
+        ]).to_list()
+        for user in users:
+            result = await Review.find({"client.$id": user["_id"], "client_name": None}).update_many({"$set": {
+                "client_name": f"{user['first_name']} {user['last_name']}",
+                "client_avatar_url": user.get("avatar_url"),
+            }})
+            updated += result.modified_count if result else 0
+        print(f"Backfilled {updated} reviews...")
+    print(f"Backfilled {updated} reviews from {len(client_ids)} clients")
+
+
+async def rebuild_ratings(args: argparse.Namespace) -> None:
+    """Recompute every consultant's rating total, star histogram and Bayesian score from their reviews"""
+    # Count reviews per (consultant, star) first, so each consultant's row
+    # carries at most five star counts however many reviews they have
+    rows = Review.aggregate([
+        {"$group": {
+            "_id": {
+                "consultant": {"$getField": {"field": {"$literal": "$id"}, "input": "$consultant"}},
+                "rating": "$rating",
+            },
+            "count": {"$sum": 1},
+        }},
+        {"$group": {
+            "_id": "$_id.consultant",
+            "stars": {"$push": {"rating": "$_id.rating", "count": "$count"}},
+        }},
+    ])
+
+    rated = []
+    async for row in rows:
+        histogram = {str(star["rating"]): star["count"] for star in row["stars"]}
+        count = sum(star["count"] for star in row["stars"])
+        total = sum(star["rating"] * star["count"] for star in row["stars"])
+        await User.find_one(User.id == row["_id"]).update({"$set": {
+            "rating_total": total,
+            "review_count": count,
+            "rating": total / count,
+            "rating_histogram": histogram,
+            "bayesian_rating": compute_bayesian_rating(total, count),
+        }})
+        rated.append(row["_id"])
+        if len(rated) % 500 == 0:
+            print(f"Rebuilt ratings for {len(rated)} consultants...")
+
+    # Consultants without reviews sit at the prior
+    await User.find({"role": UserRole.CONSULTANT.value, "_id": {"$nin": rated}}).update_many({"$set": {
+        "rating_total": 0,
+        "review_count": 0,
+        "rating_histogram": {},
+        "bayesian_rating": compute_bayesian_rating(0, 0),
+    }})
+    print(f"Rebuilt ratings for {len(rated)} reviewed consultants")
+
+
+async def requeue_dead_emails(args: argparse.Namespace) -> None:
+    """Retry every email that exhausted its attempts"""
+    count = await email_queue_service.requeue_dead()
+    print(f"Requeued {count} dead-lettered emails")
+
+
+async def db_status(args: argparse.Namespace) -> None:
+    """Show the replica set members, where secondary reads land, and pool utilization"""
+    topology = mongodb.client.topology_description
+    print(f"Topology: {topology.topology_type_name}")
+    for address, server in sorted(topology.server_descriptions().items()):
+        print(f"  {address[0]}:{address[1]}  {server.server_type_name}")
+
+    # Run one routed read and report which member served it
+    cursor = secondary_aggregate(User, [{"$limit": 1}])
+    await cursor.to_list()
+    status = pool_status()
+    if cursor.address:
+        print(f"Secondary reads ({status['secondary_read_preference']}) served by {cursor.address[0]}:{cursor.address[1]}")
+
+    print(f"Connection pools (max {status['max_pool_size']} per server):")
+    for server in status["servers"]:
+        print(
+            f"  {server['address']}  open={server['open']} in_use={server['in_use']} "
+            f"waiting={server['waiting']} utilization={server['utilization']:.1%} "
+            f"checkout_timeouts={server['checkout_timeouts']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro Consulting maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-daily-stats",
+        help="Backfill or rebuild the daily_stats rollup collection"
+    )
+    rebuild.add_argument("--since", help="Only rebuild days on or after this date (YYYY-MM-DD)")
+    rebuild.set_defaults(handler=rebuild_daily_stats)
+
+    reindex = commands.add_parser(
+        "reindex-user-search",
+        help="Recompute the normalized keys used by user and consultant search"
+    )
+    reindex.set_defaults(handler=reindex_user_search)
+
+    authors = commands.add_parser(
+        "backfill-review-authors",
+        help="Copy client names and avatars onto reviews that predate them"
+    )
+    authors.set_defaults(handler=backfill_review_authors)
+
+    ratings = commands.add_parser(
+        "rebuild-ratings",
+        help="Recompute consultant ratings, star histograms and Bayesian scores from reviews"
+    )
+    ratings.set_defaults(handler=rebuild_ratings)
+
+    requeue = commands.add_parser(
+        "requeue-dead-emails",
+        help="Give dead-lettered notification emails a fresh set of retries"
+    )
+    requeue.set_defaults(handler=requeue_dead_emails)
+
+    status = commands.add_parser(
+        "db-status",
+        help="Show replica set members, secondary read routing and connection pool utilization"
+    )
+    status.set_defaults(handler=db_status)
+
+    args = parser.parse_args()
+
+    async def run() -> None:
+        await init_db()
+        await args.handler(args)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Bulk admin actions: chunked updates and job progress kept in `bulk_jobs`.
+Runs against an in-memory mongomock database initialized with Beanie.
+"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from app.core.config import settings
+from app.models.bulk_job import BulkJob, BulkJobStatus
+from app.models.user import User, UserRole
+from app.services import bulk_action_service as bulk_module
+from app.services.bulk_action_service import BulkActionService
+
+
+@pytest_asyncio.fixture
+async def database(monkeypatch):
+    """A Beanie-initialized in-memory database with five clients"""
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client[settings.DATABASE_NAME], document_models=[User, BulkJob])
+    for i in range(5):
+        await User(
+            email=f"client{i}@example.com", hashed_password="x", first_name="Ada", last_name="Lovelace",
+            role=UserRole.CLIENT, credits=10.0,
+        ).insert()
+    monkeypatch.setattr(bulk_module, "BULK_CHUNK_SIZE", 2)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_job_progress_is_stored(database):
+    service = BulkActionService()
+
+    job = await service.start("adjust_credits", {"role": UserRole.CLIENT.value}, 5)
+    assert job.status == BulkJobStatus.RUNNING
+    await asyncio.gather(*service._tasks.values())
+
+    # A fresh service instance, as on another worker, sees the finished job
+    stored = await BulkActionService().get_job(job.id)
+    assert stored.status == BulkJobStatus.COMPLETED
+    assert (stored.total, stored.processed, stored.modified) == (5, 5, 5)
+    assert stored.finished_at is not None
+    assert {user.credits for user in await User.find_all().to_list()} == {15.0}
+
+
+@pytest.mark.asyncio
+async def test_small_job_finishes_inline(database):
+    job = await BulkActionService().start("deactivate", {"email": "client0@example.com"})
+
+    assert job.status == BulkJobStatus.COMPLETED
+    assert (job.processed, job.modified) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_unknown_job(database):
+    service = BulkActionService()
+
+    assert await service.get_job("not-an-id") is None
+    assert await service.get_job("0" * 24) is None
@@ -0,0 +1,109 @@
+"""
+MongoDB wiring: secondary read routing and connection pool counters.
+Runs without a server: reads go through an in-memory mongomock database
+initialized with Beanie, and pool events are synthetic.
+"""
+import pytest
+import pytest_asyncio
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.db import mongodb
+from app.models.user import User, UserRole
+
+ADDRESS = ("db1.example.com", 27017)
+
+
+@pytest_asyncio.fixture
+async def database(monkeypatch):
+    """A Beanie-initialized in-memory database with two users, one a consultant"""
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client[settings.DATABASE_NAME], document_models=[User])
+    for role in (UserRole.CONSULTANT, UserRole.CLIENT):
+        await User(
+            email=f"{role.value}@example.com", hashed_password="x", first_name="Ada", last_name="Lovelace", role=role
+        ).insert()
+    monkeypatch.setattr(mongodb, "client", client)
+    return client
+
+
+CONSULTANTS = [{"$match": {"role": UserRole.CONSULTANT.value}}, {"$project": {"email": 1}}]
+
+
+@pytest.mark.asyncio
+async def test_secondary_database_uses_configured_read_preference(database, monkeypatch):
+    monkeypatch.setattr(settings, "MONGODB_SECONDARY_READ_PREFERENCE", "nearest")
+    client = AsyncIOMotorClient("mongodb://localhost:27017", connect=False)
+    try:
+        monkeypatch.setattr(mongodb, "secondary_db", mongodb.secondary_database(client))
+
+        cursor = mongodb.secondary_aggregate(User, CONSULTANTS)
+
+        assert cursor.collection.name == User.get_collection_name()
+        assert cursor.collection.database.name == settings.DATABASE_NAME
+        assert cursor.collection.read_preference.mongos_mode == "nearest"
+    finally:
+        client.close()
+
+
+@pytest.mark.asyncio
+async def test_secondary_aggregate_reads_from_secondary_db(database, monkeypatch):
+    monkeypatch.setattr(mongodb, "secondary_db", mongodb.secondary_database(database))
+
+    docs = await mongodb.secondary_aggregate(User, CONSULTANTS).to_list(None)
+
+    assert [doc["email"] for doc in docs] == ["consultant@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_secondary_aggregate_falls_back_to_model_database(database, monkeypatch):
+    # As in scripts that call init_beanie without init_db
+    monkeypatch.setattr(mongodb, "secondary_db", None)
+
+    docs = await mongodb.secondary_aggregate(User, CONSULTANTS).to_list(None)
+    streamed = [doc async for doc in mongodb.secondary_aggregate(User, CONSULTANTS)]
+
+    assert [doc["email"] for doc in docs] == ["consultant@example.com"]
+    assert streamed == docs
+
+
+def test_pool_stats_counts_checkouts():
+    stats = mongodb.PoolStats()
+    stats.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {}))
+    for connection_id in (1, 2):
+        stats.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, connection_id))
+        stats.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+        stats.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, connection_id, 0.001))
+    stats.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 2))
+    stats.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+
+    [server] = stats.snapshot()
+    assert server["address"] == "db1.example.com:27017"
+    assert (server["open"], server["in_use"], server["idle"], server["waiting"]) == (2, 1, 1, 1)
+    assert server["utilization"] == round(1 / settings.MONGODB_MAX_POOL_SIZE, 3)
+
+
+def test_pool_stats_counts_checkout_timeouts():
+    stats = mongodb.PoolStats()
+    for reason in (
+        monitoring.ConnectionCheckOutFailedReason.TIMEOUT,
+        monitoring.ConnectionCheckOutFailedReason.CONN_ERROR,
+    ):
+        stats.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+        stats.connection_check_out_failed(monitoring.ConnectionCheckOutFailedEvent(ADDRESS, reason, 0.5))
+
+    [server] = stats.snapshot()
+    assert server["waiting"] == 0
+    assert server["checkout_failures"] == 2
+    assert server["checkout_timeouts"] == 1
+
+
+def test_pool_stats_forgets_closed_pools():
+    stats = mongodb.PoolStats()
+    stats.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 1))
+    stats.pool_closed(monitoring.PoolClosedEvent(ADDRESS))
+
+    assert stats.snapshot() == []
@@ -3,6 +3,9 @@ import type { WebRTCConfig, PlatformStats, AdminUser, RevenueAnalytics, UserAnal
 
 const API_PREFIX = '/api/v1';
 
+// Admin analytics are bucketed on the viewer's local day boundaries
+const localTimeZone = () => Intl.DateTimeFormat().resolvedOptions().timeZone || 'UTC';
+
 export const configApi = {
   /**
    * Get WebRTC configuration (ICE servers)
@@ -23,10 +26,20 @@ export const configApi = {
 
 export const adminApi = {
   /**
-   * Get platform statistics
+   * Get platform statistics (pass fresh to bypass the server-side cache)
    */
-  getStats: async (): Promise<PlatformStats> => {
-    const response = await apiClient.get<PlatformStats>(`${API_PREFIX}/admin/stats`);
+  getStats: async (fresh: boolean = false): Promise<PlatformStats> => {
+    const response = await apiClient.get<PlatformStats>(`${API_PREFIX}/admin/stats`, {
+      params: fresh ? { fresh: 1 } : undefined,
+    });
+    return response.data;
+  },
+
+  /**
+   * Get MongoDB connection pool settings and per-server utilization
+   */
+  getDbPool: async (): Promise<any> => {
+    const response = await apiClient.get(`${API_PREFIX}/admin/db/pool`);
     return response.data;
   },
 
@@ -59,6 +72,29 @@ export const adminApi = {
     return response.data;
   },
 
+  /**
+   * Perform an action on many users (by ids or filter); large targets run as a job
+   */
+  bulkUserAction: async (data: {
+    action: string;
+    value?: number;
+    user_ids?: string[];
+    role?: string;
+    created_after?: string;
+    created_before?: string;
+  }): Promise<any> => {
+    const response = await apiClient.post(`${API_PREFIX}/admin/users/bulk-action`, data);
+    return response.data;
+  },
+
+  /**
+   * Get progress of a bulk user action job
+   */
+  getBulkUserAction: async (jobId: string): Promise<any> => {
+    const response = await apiClient.get(`${API_PREFIX}/admin/users/bulk-action/${jobId}`);
+    return response.data;
+  },
+
   /**
    * Get all sessions
    */
@@ -75,7 +111,7 @@ export const adminApi = {
    * Get revenue analytics
    */
   getRevenueAnalytics: async (days: number = 30): Promise<RevenueAnalytics> => {
-    const response = await apiClient.get<RevenueAnalytics>(`${API_PREFIX}/admin/analytics/revenue`, { params: { days } });
+    const response = await apiClient.get<RevenueAnalytics>(`${API_PREFIX}/admin/analytics/revenue`, { params: { days, tz: localTimeZone() } });
     return response.data;
   },
 
@@ -83,7 +119,7 @@ export const adminApi = {
    * Get user analytics
    */
   getUserAnalytics: async (days: number = 30): Promise<UserAnalytics> => {
-    const response = await apiClient.get<UserAnalytics>(`${API_PREFIX}/admin/analytics/users`, { params: { days } });
+    const response = await apiClient.get<UserAnalytics>(`${API_PREFIX}/admin/analytics/users`, { params: { days, tz: localTimeZone() } });
     return response.data;
   },
 };
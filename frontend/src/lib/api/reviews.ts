@@ -13,10 +13,20 @@ export const reviewsApi = {
   },
 
   /**
-   * Get reviews for a consultant
+   * Get reviews for a consultant, newest first.
+   * For the next page, pass the last review received as `after`.
    */
-  getForConsultant: async (consultantId: string): Promise<Review[]> => {
-    const response = await apiClient.get<Review[]>(`${API_PREFIX}/reviews/consultant/${consultantId}`);
+  getForConsultant: async (
+    consultantId: string,
+    params?: { limit?: number; after?: Review }
+  ): Promise<Review[]> => {
+    const response = await apiClient.get<Review[]>(`${API_PREFIX}/reviews/consultant/${consultantId}`, {
+      params: {
+        limit: params?.limit,
+        before: params?.after?.created_at,
+        before_id: params?.after?.id,
+      },
+    });
     return response.data;
   },
 };
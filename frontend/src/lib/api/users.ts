@@ -1,8 +1,11 @@
 import { apiClient } from './client';
-import type { User, UserCreate, UserUpdate, LoginResponse } from '../../types';
+import type { User, UserCreate, UserUpdate, LoginResponse, ConsultantSearchResult, SkillSuggestion, PublicUser } from '../../types';
 
 const API_PREFIX = '/api/v1';
 
+// Longer id lists are sent in a POST body rather than the query string
+const MAX_QUERY_STRING_IDS = 50;
+
 export const authApi = {
   /**
    * Register a new user
@@ -38,6 +41,20 @@ export const authApi = {
   },
 };
 
+export interface ConsultantSearchParams {
+  search?: string;
+  category?: string;
+  skills?: string[];
+  prefix?: boolean;
+  min_price?: number;
+  max_price?: number;
+  sort?: 'rating' | 'price' | 'review_count' | 'newest';
+  available_now?: boolean;
+  online_first?: boolean;
+  skip?: number;
+  limit?: number;
+}
+
 export const usersApi = {
   /**
    * Update user profile
@@ -58,22 +75,63 @@ export const usersApi = {
   /**
    * Search consultants
    */
-  searchConsultants: async (params?: {
-    search?: string;
-    category?: string;
-    skills?: string[];
-    skip?: number;
-    limit?: number;
-  }): Promise<User[]> => {
-    const response = await apiClient.get<User[]>(`${API_PREFIX}/users/consultants`, { params });
+  searchConsultants: async (params?: ConsultantSearchParams): Promise<PublicUser[]> => {
+    const response = await apiClient.get<PublicUser[]>(`${API_PREFIX}/users/consultants`, { params });
+    return response.data;
+  },
+
+  /**
+   * Search consultants, with result counts per category, skill, price band and status
+   */
+  searchConsultantsWithFacets: async (params?: ConsultantSearchParams): Promise<ConsultantSearchResult> => {
+    const response = await apiClient.get<ConsultantSearchResult>(`${API_PREFIX}/users/consultants`, {
+      params: { ...params, facets: true },
+    });
+    return response.data;
+  },
+
+  /**
+   * Suggest skills starting with a prefix, most listed first
+   */
+  suggestSkills: async (prefix: string, limit?: number): Promise<SkillSuggestion[]> => {
+    const response = await apiClient.get<SkillSuggestion[]>(`${API_PREFIX}/users/skills/suggest`, {
+      params: { prefix, limit },
+    });
+    return response.data;
+  },
+
+  /**
+   * Consultants similar to the given one, e.g. as alternatives when they're busy
+   */
+  getSimilar: async (
+    userId: string,
+    params?: { limit?: number; available_now?: boolean; max_price?: number }
+  ): Promise<PublicUser[]> => {
+    const response = await apiClient.get<PublicUser[]>(`${API_PREFIX}/users/${userId}/similar`, { params });
+    return response.data;
+  },
+
+  /**
+   * Get a user's public profile by ID
+   */
+  getById: async (userId: string): Promise<PublicUser> => {
+    const response = await apiClient.get<PublicUser>(`${API_PREFIX}/users/${userId}`);
     return response.data;
   },
 
   /**
-   * Get user by ID
+   * Get public profiles for many users in one request (deduplicated, in the given order)
    */
-  getById: async (userId: string): Promise<User> => {
-    const response = await apiClient.get<User>(`${API_PREFIX}/users/${userId}`);
+  getByIds: async (userIds: string[]): Promise<PublicUser[]> => {
+    const ids = Array.from(new Set(userIds));
+    if (ids.length === 0) return [];
+    if (ids.length <= MAX_QUERY_STRING_IDS) {
+      const response = await apiClient.get<PublicUser[]>(`${API_PREFIX}/users`, {
+        params: { ids: ids.join(',') },
+      });
+      return response.data;
+    }
+    const response = await apiClient.post<PublicUser[]>(`${API_PREFIX}/users/batch`, { ids });
     return response.data;
   },
 };
@@ -34,7 +34,10 @@ export const ConsultantList = () => {
         queryKey: ['consultants', search, selectedCategory],
         queryFn: async () => {
             const params: any = {};
-            if (search) params.search = search;
+            if (search) {
+                params.search = search;
+                params.prefix = true; // search-as-you-type
+            }
             if (selectedCategory && selectedCategory !== "All") params.category = selectedCategory;
 
             const res = await api.get('/api/v1/users/consultants', { params });
@@ -1,11 +1,14 @@
-import { useQuery } from '@tanstack/react-query';
+import { useInfiniteQuery, useQuery } from '@tanstack/react-query';
 import { useParams, useNavigate } from 'react-router-dom';
-import { api } from '../lib/api';
+import { api, reviewsApi } from '../lib/api';
+import type { Review } from '../types';
 import { useAuthStore } from '../store/authStore';
 import { RequestSessionModal } from '../components/RequestSessionModal';
 import { useState } from 'react';
 import { toast } from '../store/toastStore';
 
+const REVIEWS_PAGE_SIZE = 20;
+
 export const ConsultantProfile = () => {
     const { consultantId } = useParams<{ consultantId: string }>();
     const navigate = useNavigate();
@@ -21,14 +24,22 @@ export const ConsultantProfile = () => {
         enabled: !!consultantId
     });
 
-    const { data: reviews } = useQuery({
+    // Newest first, one page at a time; each page continues after the last review shown
+    const {
+        data: reviewPages,
+        fetchNextPage: fetchMoreReviews,
+        hasNextPage: hasMoreReviews,
+        isFetchingNextPage: isFetchingMoreReviews
+    } = useInfiniteQuery({
         queryKey: ['consultant-reviews', consultantId],
-        queryFn: async () => {
-            const res = await api.get(`/api/v1/reviews/consultant/${consultantId}`);
-            return res.data;
-        },
+        queryFn: ({ pageParam }) =>
+            reviewsApi.getForConsultant(consultantId!, { limit: REVIEWS_PAGE_SIZE, after: pageParam }),
+        initialPageParam: undefined as Review | undefined,
+        getNextPageParam: (lastPage) =>
+            lastPage.length < REVIEWS_PAGE_SIZE ? undefined : lastPage[lastPage.length - 1],
         enabled: !!consultantId
     });
+    const reviews = reviewPages?.pages.flat();
 
     const handleBookNow = () => {
         if (!user) {
@@ -173,10 +184,10 @@ export const ConsultantProfile = () => {
                     <div className="bg-white rounded-3xl p-8 shadow-soft border border-gray-100">
                         <h2 className="text-2xl font-extrabold text-gray-900 mb-6 flex items-center gap-2">
                             <span className="material-icons-round text-[#FF5A5F]">star</span>
-                            Reviews ({reviews.length})
+                            Reviews ({consultant?.review_count ?? reviews.length})
                         </h2>
                         <div className="space-y-4">
-                            {reviews.map((review: any) => (
+                            {reviews.map((review) => (
                                 <div key={review.id} className="border-b border-gray-100 pb-4 last:border-0">
                                     <div className="flex items-center gap-2 mb-2">
                                         <div className="flex">
@@ -196,6 +207,15 @@ export const ConsultantProfile = () => {
                                 </div>
                             ))}
                         </div>
+                        {hasMoreReviews && (
+                            <button
+                                onClick={() => fetchMoreReviews()}
+                                disabled={isFetchingMoreReviews}
+                                className="mt-6 w-full bg-white text-gray-900 px-6 py-3 rounded-xl text-sm font-bold border-2 border-gray-200 hover:bg-gray-50 transition disabled:opacity-50"
+                            >
+                                {isFetchingMoreReviews ? 'Loading...' : 'Load more reviews'}
+                            </button>
+                        )}
                     </div>
                 )}
             </div>
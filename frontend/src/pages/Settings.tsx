@@ -4,6 +4,7 @@ import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query';
 import { api } from '../lib/api';
 import { toast } from '../store/toastStore';
 import { useNavigate } from 'react-router-dom';
+import type { NotificationDelivery } from '../types/models';
 
 export const Settings = () => {
     const [activeTab, setActiveTab] = useState<'profile' | 'preferences'>('profile');
@@ -17,7 +18,8 @@ export const Settings = () => {
         bio: '',
         price_per_minute: 0,
         free_minutes: 15,
-        skills: ''
+        skills: '',
+        notification_delivery: 'immediate' as NotificationDelivery
     });
 
     const { data: userProfile } = useQuery({
@@ -36,7 +38,8 @@ export const Settings = () => {
                 bio: userProfile.bio || '',
                 price_per_minute: userProfile.price_per_minute || 0,
                 free_minutes: userProfile.free_minutes || 15,
-                skills: userProfile.skills?.join(', ') || ''
+                skills: userProfile.skills?.join(', ') || '',
+                notification_delivery: userProfile.notification_delivery || 'immediate'
             });
         }
     }, [userProfile]);
@@ -65,6 +68,13 @@ export const Settings = () => {
         });
     };
 
+    const handlePreferencesSave = () => {
+        updateProfileMutation.mutate({
+            notification_delivery: formData.notification_delivery,
+            ...(user?.role === 'consultant' && { free_minutes: parseInt(formData.free_minutes.toString()) })
+        });
+    };
+
     const handleLogout = () => {
         logout();
         navigate('/');
@@ -205,6 +215,30 @@ export const Settings = () => {
                                     </div>
                                 )}
 
+                                <div>
+                                    <label className="block text-sm font-bold text-gray-700 mb-2">
+                                        Session Emails
+                                    </label>
+                                    <p className="text-xs text-gray-500 mb-3">
+                                        Get an email for every request and update, or one digest every few minutes
+                                    </p>
+                                    <div className="relative">
+                                        <span className="material-icons-round absolute left-3 top-1/2 -translate-y-1/2 text-gray-400">
+                                            mail
+                                        </span>
+                                        <select
+                                            value={formData.notification_delivery}
+                                            onChange={e =>
+                                                setFormData({ ...formData, notification_delivery: e.target.value as NotificationDelivery })
+                                            }
+                                            className="w-full pl-10 pr-3 py-3 border border-gray-300 bg-white rounded-xl text-sm text-gray-900 focus:ring-2 focus:ring-[#FF5A5F] focus:border-transparent outline-none"
+                                        >
+                                            <option value="immediate">Immediately</option>
+                                            <option value="digest">Batched digest</option>
+                                        </select>
+                                    </div>
+                                </div>
+
                                 <div className="bg-blue-50 border border-blue-200 rounded-xl p-5">
                                     <div className="flex items-center gap-2 mb-3">
                                         <span className="material-icons-round text-blue-600">account_circle</span>
@@ -228,16 +262,14 @@ export const Settings = () => {
                                     </div>
                                 </div>
 
-                                {user?.role === 'consultant' && (
-                                    <button
-                                        onClick={handleProfileSave}
-                                        disabled={updateProfileMutation.isPending}
-                                        className="bg-[#FF5A5F] text-white px-6 py-3 rounded-xl text-sm font-bold flex items-center gap-2 hover:bg-[#E04F54] transition disabled:opacity-50 shadow-md active:scale-95"
-                                    >
-                                        <span className="material-icons-round">save</span>
-                                        {updateProfileMutation.isPending ? 'Saving...' : 'Save Preferences'}
-                                    </button>
-                                )}
+                                <button
+                                    onClick={handlePreferencesSave}
+                                    disabled={updateProfileMutation.isPending}
+                                    className="bg-[#FF5A5F] text-white px-6 py-3 rounded-xl text-sm font-bold flex items-center gap-2 hover:bg-[#E04F54] transition disabled:opacity-50 shadow-md active:scale-95"
+                                >
+                                    <span className="material-icons-round">save</span>
+                                    {updateProfileMutation.isPending ? 'Saving...' : 'Save Preferences'}
+                                </button>
 
                                 <div className="pt-6 border-t border-gray-200">
                                     <button
@@ -1,5 +1,6 @@
 // User Types
 export type UserRole = 'client' | 'consultant' | 'admin';
+export type NotificationDelivery = 'immediate' | 'digest';
 
 export interface User {
   id: string;
@@ -15,13 +16,19 @@ export interface User {
   price_per_minute?: number;
   rating: number;
   review_count: number;
+  rating_histogram?: Record<string, number>;  // Reviews per star, keyed '1' to '5'
+  bayesian_rating?: number | null;
   category: string;
   avatar_url?: string;
   status: 'online' | 'offline' | 'busy';
   timezone: string;
+  notification_delivery?: NotificationDelivery;
   created_at?: string;
 }
 
+// Profile fields visible to anyone (no email or credits)
+export type PublicUser = Omit<User, 'email' | 'credits' | 'created_at' | 'notification_delivery'>;
+
 export interface UserCreate {
   email: string;
   password: string;
@@ -40,6 +47,31 @@ export interface UserUpdate {
   status?: 'online' | 'offline' | 'busy';
   category?: string;
   avatar_url?: string;
+  notification_delivery?: NotificationDelivery;
+}
+
+export interface FacetCount {
+  value: string;
+  count: number;
+  min_price?: number | null;
+  max_price?: number | null;
+}
+
+export interface ConsultantFacets {
+  category: FacetCount[];
+  skills: FacetCount[];
+  price_band: FacetCount[];
+  status: FacetCount[];
+}
+
+export interface ConsultantSearchResult {
+  items: PublicUser[];
+  facets: ConsultantFacets;
+}
+
+export interface SkillSuggestion {
+  skill: string;
+  count: number;
 }
 
 // Session Types
@@ -82,6 +114,7 @@ export interface Review {
   rating: number;
   comment: string;
   client_name: string;
+  client_avatar_url?: string | null;
   created_at: string;
 }
 
@@ -190,6 +223,7 @@ export interface AdminUser {
 
 export interface RevenueAnalytics {
   period_days: number;
+  timezone: string;
   total_revenue: number;
   session_count: number;
   daily_breakdown: Array<{
@@ -200,6 +234,7 @@ export interface RevenueAnalytics {
 
 export interface UserAnalytics {
   period_days: number;
+  timezone: string;
   total_new_users: number;
   new_clients: number;
   new_consultants: number;